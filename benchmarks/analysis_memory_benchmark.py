@@ -0,0 +1,109 @@
+import os
+import sys
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from typing import List, Dict, Any
+
+# Make the repository modules importable when run as benchmarks/analysis_memory_benchmark.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from token_analyzer import build_codepoint_table, build_decoded_vocabulary, analyze_token_categories, \
+    save_analysis_results
+
+
+def run_stage(name: str, function, *args, **kwargs):
+    """
+    Run one analysis stage under tracemalloc.
+
+    Args:
+        name: Stage name used in the results
+        function: Stage function to call
+        *args, **kwargs: Arguments for the stage function
+
+    Returns:
+        Tuple of the stage's return value and a result dictionary with its wall time, the peak
+        traced memory during the stage and the traced memory still held after it, in MB
+    """
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    value = function(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    return value, {
+        'stage': name,
+        'seconds': round(seconds, 3),
+        'peak_mb': round(peak / 1e6, 1),
+        'held_after_mb': round(current / 1e6, 1),
+    }
+
+
+def run_benchmark(model_id: str, min_token_id: int = 102, lightweight: bool = False) -> List[Dict[str, Any]]:
+    """
+    Measure Python heap usage of each stage of the vocabulary analysis for one model.
+
+    Output files are written to a temporary directory. Memory held by the tokenizer library
+    itself is not traced, so the figures cover the analysis data structures.
+
+    Args:
+        model_id: Model ID or local tokenizer directory
+        min_token_id: Token IDs at or below this value are skipped
+        lightweight: Load the tokenizer with the lightweight loader instead of AutoTokenizer
+
+    Returns:
+        List of result dictionaries, one per stage
+    """
+    # The codepoint table is built once per process; keep it out of the stage figures
+    build_codepoint_table()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as output_dir:
+        os.chdir(output_dir)
+        tracemalloc.start()
+        try:
+            decoded_vocab, decode_result = run_stage('decode_vocabulary', build_decoded_vocabulary,
+                                                     model_id, min_token_id, lightweight=lightweight)
+            analysis_result, analyze_result = run_stage('analyze_categories', analyze_token_categories,
+                                                         model_id, min_token_id, decoded_vocab)
+            _, save_result = run_stage('save_results', save_analysis_results, analysis_result, 'analysis.json')
+        finally:
+            tracemalloc.stop()
+            os.chdir(cwd)
+
+    return [decode_result, analyze_result, save_result]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Peak memory benchmark for the vocabulary analysis of token_analyzer.py")
+
+    parser.add_argument('--model_id', type=str, required=True,
+                        help="Model ID or local tokenizer directory to analyze")
+    parser.add_argument('--min_token_id', type=int, default=102,
+                        help="Minimum token ID to analyze (default: 102)")
+    parser.add_argument('--lightweight_tokenizer', action='store_true',
+                        help="Load the tokenizer straight from its local tokenizer.json or SentencePiece model "
+                             "instead of AutoTokenizer")
+    parser.add_argument('--output_file', type=str, default=None,
+                        help="Optional path to save the results as JSON")
+
+    args = parser.parse_args()
+
+    results = run_benchmark(args.model_id, args.min_token_id, args.lightweight_tokenizer)
+
+    print(f"\n{'Stage':<22} {'Time':>9} {'Peak':>10} {'Held after':>12}")
+    for result in results:
+        print(f"{result['stage']:<22} {result['seconds']:>7.2f} s {result['peak_mb']:>7.1f} MB "
+              f"{result['held_after_mb']:>9.1f} MB")
+    print(f"Overall peak: {max(result['peak_mb'] for result in results):.1f} MB")
+
+    if args.output_file:
+        with open(args.output_file, 'w', encoding='utf-8') as f:
+            json.dump({'model_id': args.model_id, 'stages': results}, f, indent=2)
+        print(f"\nResults saved to: {args.output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import os
+import sys
+import argparse
+import json
+import statistics
+import subprocess
+from typing import List, Dict, Any
+
+# Repository root, so the loaders can be imported from anywhere
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOADERS = ['auto', 'lightweight']
+
+# Round-tripped through each loader to check that both decode to the same text; spaces before
+# punctuation catch differences in the clean_up_tokenization_spaces handling
+PARITY_SENTENCES = [
+    "안녕하세요, 반갑습니다!",
+    "안녕하세요  세 ! 렇지 않아 .",
+    "Hello , world . it 's fine , isn't it ?",
+    "토크나이저 비교: 한국어 (Korean) & English 123.",
+]
+
+# Runs in a fresh interpreter so import cost and resident memory are measured from a cold start
+MEASURE_SCRIPT = """
+import json, resource, sys, time
+start = time.perf_counter()
+if sys.argv[2] == 'lightweight':
+    from tokenizer_loader import load_lightweight_tokenizer
+    tokenizer = load_lightweight_tokenizer(sys.argv[1])
+else:
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(sys.argv[1])
+vocab_size = len(tokenizer.get_vocab())
+elapsed = time.perf_counter() - start
+max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+decoded = [tokenizer.decode(tokenizer(sentence)['input_ids']) for sentence in json.loads(sys.argv[3])]
+print(json.dumps({'load_s': elapsed, 'max_rss_mb': max_rss_mb, 'vocab_size': vocab_size, 'decoded': decoded}))
+"""
+
+
+def measure_load(model_id: str, loader: str, repeats: int,
+                 sentences: List[str] = PARITY_SENTENCES) -> Dict[str, Any]:
+    """
+    Load one tokenizer in fresh interpreters and measure time and peak resident memory.
+
+    Memory is read before the parity sentences are encoded and decoded, so they don't affect it.
+
+    Args:
+        model_id: Local tokenizer directory or HuggingFace model ID
+        loader: 'auto' for AutoTokenizer or 'lightweight' for tokenizer_loader
+        repeats: Number of cold loads
+        sentences: Sentences to encode and decode for the parity check
+
+    Returns:
+        Dictionary with median load time (including imports), peak RSS, vocabulary size and
+        the decoded sentences
+    """
+    runs = []
+    for _ in range(repeats):
+        completed = subprocess.run([sys.executable, '-c', MEASURE_SCRIPT, model_id, loader, json.dumps(sentences)],
+                                   cwd=REPO_ROOT, check=True, capture_output=True, text=True)
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    return {
+        'model_id': model_id,
+        'loader': loader,
+        'load_median_s': round(statistics.median(run['load_s'] for run in runs), 4),
+        'max_rss_mb': round(statistics.median(run['max_rss_mb'] for run in runs), 1),
+        'vocab_size': runs[0]['vocab_size'],
+        'repeats': repeats,
+        'decoded': runs[0]['decoded'],
+    }
+
+
+def check_decode_parity(results: List[Dict[str, Any]], sentences: List[str] = PARITY_SENTENCES) -> List[Dict[str, Any]]:
+    """
+    Compare the decoded parity sentences of the lightweight loader with those of AutoTokenizer.
+
+    Args:
+        results: Results of measure_load for both loaders of each model
+        sentences: Sentences the results were decoded from
+
+    Returns:
+        One dictionary per sentence that decodes differently, with the model and both decoded texts
+    """
+    decoded = {(result['model_id'], result['loader']): result['decoded'] for result in results}
+    mismatches = []
+    for model_id in dict.fromkeys(result['model_id'] for result in results):
+        if (model_id, 'auto') not in decoded or (model_id, 'lightweight') not in decoded:
+            continue
+        for sentence, auto_text, lightweight_text in zip(sentences, decoded[(model_id, 'auto')],
+                                                         decoded[(model_id, 'lightweight')]):
+            if auto_text != lightweight_text:
+                mismatches.append({'model_id': model_id, 'sentence': sentence,
+                                   'auto': auto_text, 'lightweight': lightweight_text})
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare cold load time and memory of AutoTokenizer and the lightweight tokenizer loader")
+
+    parser.add_argument('--models', type=str, required=True,
+                        help="List of model IDs or local tokenizer directories, separated by spaces")
+    parser.add_argument('--repeats', type=int, default=3,
+                        help="Number of cold loads per model and loader (default: 3)")
+    parser.add_argument('--output_file', type=str, default=None,
+                        help="Optional path to save the results as JSON")
+
+    args = parser.parse_args()
+
+    results = []
+    for model_id in args.models.split():
+        for loader in LOADERS:
+            try:
+                results.append(measure_load(model_id, loader, args.repeats))
+            except subprocess.CalledProcessError as e:
+                print(f"✗ Failed to load {model_id} with {loader} loader: {e.stderr.strip().splitlines()[-1]}")
+
+    print(f"{'Model':<40} {'Loader':<12} {'Load (median)':>14} {'Peak RSS':>10} {'Vocab':>8}")
+    for result in results:
+        model_name = result['model_id'].split('/')[-1]
+        print(f"{model_name:<40} {result['loader']:<12} {result['load_median_s']:>12.3f} s "
+              f"{result['max_rss_mb']:>7.0f} MB {result['vocab_size']:>8}")
+
+    mismatches = check_decode_parity(results)
+    if mismatches:
+        print(f"\n✗ Decoded text differs between the loaders for {len(mismatches)} sentences:")
+        for mismatch in mismatches:
+            print(f"- {mismatch['model_id']}: auto {mismatch['auto']!r} | lightweight {mismatch['lightweight']!r}")
+    else:
+        print("\n✓ Both loaders decode the parity sentences to the same text")
+
+    if args.output_file:
+        for result in results:
+            if result['loader'] == 'lightweight':
+                result['decode_mismatches'] = [mismatch for mismatch in mismatches
+                                               if mismatch['model_id'] == result['model_id']]
+        with open(args.output_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nResults saved to: {args.output_file}")
+
+
+if __name__ == "__main__":
+    main()
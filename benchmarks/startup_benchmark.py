@@ -0,0 +1,121 @@
+import os
+import sys
+import argparse
+import json
+import statistics
+import subprocess
+import time
+from typing import List, Dict, Any
+
+# Repository root, so the entry points can be imported and run from anywhere
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = ['token_analyzer', 'run_analyzer', 'generate_examples']
+
+# Libraries that should only be imported by the stages that need them
+HEAVY_MODULES = ['transformers', 'tokenizers', 'pandas', 'matplotlib', 'seaborn', 'torch']
+
+
+def time_help(entry_point: str, repeats: int) -> List[float]:
+    """
+    Time `python <entry_point>.py --help` in fresh interpreters.
+
+    Args:
+        entry_point: Module name of the entry point script
+        repeats: Number of runs
+
+    Returns:
+        Wall time of each run in seconds
+    """
+    script = os.path.join(REPO_ROOT, f"{entry_point}.py")
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, script, '--help'], cwd=REPO_ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def measure_import(entry_point: str) -> Dict[str, Any]:
+    """
+    Import an entry point module with -X importtime and report its cost.
+
+    Args:
+        entry_point: Module name of the entry point script
+
+    Returns:
+        Dictionary with the cumulative import time in milliseconds and the heavy modules loaded
+    """
+    code = (f"import sys, json; import {entry_point}; "
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=REPO_ROOT, check=True,
+                               capture_output=True, text=True)
+
+    # importtime lines look like "import time:  self [us] | cumulative | imported package"
+    import_ms = None
+    for line in completed.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == entry_point:
+            import_ms = int(parts[1]) / 1000
+
+    return {
+        'import_ms': import_ms,
+        'heavy_modules_loaded': json.loads(completed.stdout.strip().splitlines()[-1])
+    }
+
+
+def run_benchmark(entry_points: List[str], repeats: int = 5) -> List[Dict[str, Any]]:
+    """
+    Measure startup cost for each entry point.
+
+    Args:
+        entry_points: Module names of the entry point scripts
+        repeats: Number of `--help` runs per entry point
+
+    Returns:
+        List of result dictionaries, one per entry point
+    """
+    results = []
+    for entry_point in entry_points:
+        timings = time_help(entry_point, repeats)
+        result = {
+            'entry_point': entry_point,
+            'help_median_s': round(statistics.median(timings), 4),
+            'help_min_s': round(min(timings), 4),
+            'repeats': repeats,
+        }
+        result.update(measure_import(entry_point))
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Startup-time benchmark for the command-line entry points")
+
+    parser.add_argument('--entry_points', type=str, default=' '.join(ENTRY_POINTS),
+                        help="Entry point modules to benchmark, separated by spaces")
+    parser.add_argument('--repeats', type=int, default=5,
+                        help="Number of --help runs per entry point (default: 5)")
+    parser.add_argument('--output_file', type=str, default=None,
+                        help="Optional path to save the results as JSON")
+
+    args = parser.parse_args()
+
+    results = run_benchmark(args.entry_points.split(), args.repeats)
+
+    print(f"{'Entry point':<20} {'--help median':>14} {'import':>10}  Heavy modules loaded on import")
+    for result in results:
+        import_ms = f"{result['import_ms']:.0f} ms" if result['import_ms'] is not None else "n/a"
+        heavy = ', '.join(result['heavy_modules_loaded']) or '-'
+        print(f"{result['entry_point']:<20} {result['help_median_s']:>12.3f} s {import_ms:>10}  {heavy}")
+
+    if args.output_file:
+        with open(args.output_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to: {args.output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import os
+import sys
+import argparse
+import json
+import time
+from typing import List, Dict, Any
+
+# Make the repository modules importable when run as benchmarks/tokenize_benchmark.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_examples import load_tokenizers, tokenize_sentence, tokenize_batch, tokenize_threaded, \
+    iter_corpus_sentences, ENCODE_BATCH_SIZE
+
+
+def time_per_sentence(tokenizer, sentences: List[str]) -> float:
+    """Return the seconds taken to tokenize sentences one at a time with tokenize_sentence."""
+    start = time.perf_counter()
+    for sentence in sentences:
+        tokenize_sentence(tokenizer, sentence)
+    return time.perf_counter() - start
+
+
+def time_batched(tokenizer, sentences: List[str], batch_size: int) -> float:
+    """Return the seconds taken to tokenize sentences batch_size at a time with tokenize_batch."""
+    start = time.perf_counter()
+    for begin in range(0, len(sentences), batch_size):
+        tokenize_batch(tokenizer, sentences[begin:begin + batch_size])
+    return time.perf_counter() - start
+
+
+def time_threaded(tokenizer, sentences: List[str], batch_size: int, threads: int) -> float:
+    """Return the seconds taken to tokenize sentences with tokenize_threaded on threads threads."""
+    start = time.perf_counter()
+    tokenize_threaded(tokenizer, sentences, batch_size, threads)
+    return time.perf_counter() - start
+
+
+def run_thread_scaling(tokenizers: Dict[str, Any], sentences: List[str], batch_size: int,
+                       max_threads: int) -> List[Dict[str, Any]]:
+    """
+    Measure sentences per second of tokenize_threaded from 1 to max_threads threads for each model.
+
+    Args:
+        tokenizers: Dictionary mapping model names to tokenizer objects
+        sentences: Sentences to tokenize
+        batch_size: Maximum number of sentences per encode call
+        max_threads: Largest thread count measured
+
+    Returns:
+        List of result dictionaries, one per model and thread count
+    """
+    results = []
+    for model_name, tokenizer in tokenizers.items():
+        tokenize_batch(tokenizer, sentences[:batch_size])
+
+        serial_s = None
+        for threads in range(1, max_threads + 1):
+            elapsed = time_threaded(tokenizer, sentences, batch_size, threads)
+            serial_s = serial_s or elapsed
+            results.append({
+                'model': model_name,
+                'threads': threads,
+                'sentences_per_s': round(len(sentences) / elapsed, 1),
+                'speedup': round(serial_s / elapsed, 2),
+            })
+    return results
+
+
+def run_benchmark(tokenizers: Dict[str, Any], sentences: List[str], batch_size: int) -> List[Dict[str, Any]]:
+    """
+    Measure sentences per second of per-sentence and batched tokenization for each model.
+
+    Args:
+        tokenizers: Dictionary mapping model names to tokenizer objects
+        sentences: Sentences to tokenize
+        batch_size: Number of sentences per batched encode call
+
+    Returns:
+        List of result dictionaries, one per model
+    """
+    results = []
+    for model_name, tokenizer in tokenizers.items():
+        # Warm up caches so neither mode pays for first-call setup
+        tokenize_batch(tokenizer, sentences[:batch_size])
+
+        per_sentence_s = time_per_sentence(tokenizer, sentences)
+        batched_s = time_batched(tokenizer, sentences, batch_size)
+        results.append({
+            'model': model_name,
+            'sentences': len(sentences),
+            'batch_size': batch_size,
+            'per_sentence_per_s': round(len(sentences) / per_sentence_s, 1),
+            'batched_per_s': round(len(sentences) / batched_s, 1),
+            'speedup': round(per_sentence_s / batched_s, 2),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark per-sentence versus batched tokenization in generate_examples")
+
+    parser.add_argument('--models', type=str, required=True,
+                        help="List of model IDs to benchmark, separated by spaces")
+    parser.add_argument('--file', type=str, required=True,
+                        help="Path to a text file containing sentences (one per line)")
+    parser.add_argument('--num_sentences', type=int, default=10000,
+                        help="Number of sentences to read from --file (default: 10000)")
+    parser.add_argument('--batch_size', type=int, default=ENCODE_BATCH_SIZE,
+                        help=f"Number of sentences per batched encode call (default: {ENCODE_BATCH_SIZE})")
+    parser.add_argument('--lightweight_tokenizer', action='store_true',
+                        help="Load tokenizers with the lightweight loader instead of AutoTokenizer")
+    parser.add_argument('--threads', type=int, default=None,
+                        help="Also measure a thread scaling curve of tokenize_threaded from 1 to N threads")
+    parser.add_argument('--output_file', type=str, default=None,
+                        help="Optional path to save the results as JSON")
+
+    args = parser.parse_args()
+
+    sentences = []
+    for sentence in iter_corpus_sentences(args.file):
+        if len(sentences) >= args.num_sentences:
+            break
+        sentences.append(sentence)
+
+    tokenizers = load_tokenizers(args.models.split(), args.lightweight_tokenizer)
+    results = run_benchmark(tokenizers, sentences, args.batch_size)
+
+    print(f"\n{'Model':<40} {'Per-sentence':>14} {'Batched':>14} {'Speedup':>8}")
+    for result in results:
+        print(f"{result['model']:<40} {result['per_sentence_per_s']:>10.0f} s/s {result['batched_per_s']:>10.0f} s/s "
+              f"{result['speedup']:>7.2f}x")
+
+    if args.threads:
+        scaling = run_thread_scaling(tokenizers, sentences, args.batch_size, args.threads)
+        print(f"\n{'Model':<40} {'Threads':>8} {'Sentences/s':>14} {'Speedup':>8}")
+        for result in scaling:
+            print(f"{result['model']:<40} {result['threads']:>8} {result['sentences_per_s']:>14.0f} "
+                  f"{result['speedup']:>7.2f}x")
+        results = {'batching': results, 'thread_scaling': scaling}
+
+    if args.output_file:
+        with open(args.output_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to: {args.output_file}")
+
+
+if __name__ == "__main__":
+    main()
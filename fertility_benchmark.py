@@ -0,0 +1,221 @@
+import os
+import argparse
+import json
+import time
+from datetime import datetime
+from typing import List, Dict, Any
+
+import numpy as np
+
+from generate_examples import load_tokenizers, iter_corpus_sentences, iter_batches
+from token_analyzer import build_codepoint_table, CHAR_HANGUL
+
+# Metrics compared against a baseline run, with whether a lower value is better
+COMPARED_METRICS = {
+    'fertility': True,
+    'tokens_per_hangul_char': True,
+    'tokens_per_eojeol': True,
+    'bytes_per_token': False,
+    'chars_per_sec': False,
+    'tokens_per_sec': False,
+}
+
+
+def count_corpus_units(sentences: List[str]) -> Dict[str, int]:
+    """
+    Count characters, Hangul characters, eojeol and UTF-8 bytes in a batch of sentences.
+
+    Eojeol are the whitespace-separated units of Korean text.
+
+    Args:
+        sentences: Sentences to count
+
+    Returns:
+        Dictionary of counts for the batch
+    """
+    text = "".join(sentences)
+    codepoints = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+    hangul_chars = int(np.count_nonzero(build_codepoint_table()[codepoints] & CHAR_HANGUL))
+    eojeol = sum(len(sentence.split()) for sentence in sentences)
+
+    return {
+        'sentences': len(sentences),
+        'characters': sum(len(sentence) - sentence.count(' ') for sentence in sentences),
+        'hangul_characters': hangul_chars,
+        'eojeol': eojeol,
+        'bytes': len(text.encode('utf-8')),
+    }
+
+
+def run_fertility_benchmark(tokenizers: Dict[str, Any], sentences, batch_size: int = 1000,
+                            max_sentences: int = None) -> Dict[str, Any]:
+    """
+    Stream a corpus through every tokenizer and measure fertility, compression and throughput.
+
+    The corpus is read once, batch_size sentences at a time, and each batch is encoded by every
+    tokenizer without special tokens. Only running totals are kept, so memory stays flat.
+
+    Args:
+        tokenizers: Dictionary mapping model names to tokenizer objects
+        sentences: Iterable of sentences, e.g. from iter_corpus_sentences
+        batch_size: Number of sentences encoded per tokenizer call
+        max_sentences: Stop after this many sentences (default: whole corpus)
+
+    Returns:
+        Dictionary with corpus statistics and per-model metrics
+    """
+    corpus = {'sentences': 0, 'characters': 0, 'hangul_characters': 0, 'eojeol': 0, 'bytes': 0}
+    totals = {model_name: {'tokens': 0, 'encode_seconds': 0.0} for model_name in tokenizers}
+
+    for batch in iter_batches(sentences, batch_size):
+        if max_sentences is not None:
+            batch = batch[:max_sentences - corpus['sentences']]
+            if not batch:
+                break
+
+        for unit, count in count_corpus_units(batch).items():
+            corpus[unit] += count
+
+        for model_name, tokenizer in tokenizers.items():
+            start = time.perf_counter()
+            token_ids = tokenizer(batch, add_special_tokens=False)["input_ids"]
+            totals[model_name]['encode_seconds'] += time.perf_counter() - start
+            totals[model_name]['tokens'] += sum(len(ids) for ids in token_ids)
+
+        print(f"- Encoded {corpus['sentences']:,} sentences")
+
+    models = []
+    for model_name, model_totals in totals.items():
+        tokens = model_totals['tokens']
+        seconds = model_totals['encode_seconds']
+        models.append({
+            'model': model_name,
+            'tokens': tokens,
+            'fertility': tokens / corpus['characters'] if corpus['characters'] else 0,
+            'tokens_per_hangul_char': tokens / corpus['hangul_characters'] if corpus['hangul_characters'] else 0,
+            'tokens_per_eojeol': tokens / corpus['eojeol'] if corpus['eojeol'] else 0,
+            'bytes_per_token': corpus['bytes'] / tokens if tokens else 0,
+            'encode_seconds': seconds,
+            'chars_per_sec': corpus['characters'] / seconds if seconds else 0,
+            'tokens_per_sec': tokens / seconds if seconds else 0,
+        })
+
+    return {'corpus': corpus, 'models': models}
+
+
+def compare_with_baseline(result: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compute the relative change of each metric against a previous benchmark result.
+
+    Args:
+        result: Result of the current run
+        baseline: Result loaded from a previous run's JSON file
+
+    Returns:
+        List of rows with model, metric, baseline and current values and percentage change
+    """
+    baseline_models = {model['model']: model for model in baseline['models']}
+    rows = []
+    for model in result['models']:
+        previous = baseline_models.get(model['model'])
+        if previous is None:
+            continue
+        for metric, lower_is_better in COMPARED_METRICS.items():
+            before, after = previous.get(metric), model[metric]
+            if not before:
+                continue
+            change = (after - before) / before * 100
+            rows.append({
+                'model': model['model'],
+                'metric': metric,
+                'baseline': before,
+                'current': after,
+                'change_pct': change,
+                'improved': change < 0 if lower_is_better else change > 0,
+            })
+    return rows
+
+
+def print_fertility_summary(result: Dict[str, Any]):
+    """Print corpus statistics and per-model metrics."""
+    corpus = result['corpus']
+    print("\n=== Korean Corpus Fertility Benchmark ===")
+    print(f"Sentences: {corpus['sentences']:,} | Characters (no spaces): {corpus['characters']:,} | "
+          f"Hangul characters: {corpus['hangul_characters']:,} | Eojeol: {corpus['eojeol']:,}")
+    print(f"\n{'Model':<40} {'Tok/char':>9} {'Tok/Hangul':>11} {'Tok/eojeol':>11} {'Bytes/tok':>10} "
+          f"{'Chars/s':>12} {'Tokens/s':>12}")
+    for model in result['models']:
+        print(f"{model['model']:<40} {model['fertility']:>9.3f} {model['tokens_per_hangul_char']:>11.3f} "
+              f"{model['tokens_per_eojeol']:>11.3f} {model['bytes_per_token']:>10.3f} "
+              f"{model['chars_per_sec']:>12,.0f} {model['tokens_per_sec']:>12,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Korean Corpus Fertility Benchmark - tokens per character/eojeol, compression and throughput")
+
+    parser.add_argument('--models', type=str,
+                        default='meta-llama/Llama-4-Maverick-17B-128E meta-llama/Llama-4-Scout-17B-16E'
+                        ' deepseek-ai/DeepSeek-V3-0324 Qwen/QwQ-32B mistralai/Mistral-Small-3.1-24B-Base-2503 google/gemma-3-27b-it',
+                        help="List of model IDs to benchmark")
+    parser.add_argument('--file', type=str, required=True,
+                        help="Path to a Korean text corpus (one sentence per line)")
+    parser.add_argument('--batch_size', type=int, default=1000,
+                        help="Number of sentences encoded per tokenizer call (default: 1000)")
+    parser.add_argument('--max_sentences', type=int, default=None,
+                        help="Only use the first N sentences of the corpus")
+    parser.add_argument('--output_file', type=str, default="results/fertility_benchmark.json",
+                        help="Path to save the machine-readable results (default: results/fertility_benchmark.json)")
+    parser.add_argument('--baseline', type=str, default=None,
+                        help="Path to a previous results JSON file to compare against")
+    parser.add_argument('--lightweight_tokenizer', action='store_true',
+                        help="Load tokenizers straight from their local tokenizer.json or SentencePiece model "
+                             "instead of AutoTokenizer")
+
+    args = parser.parse_args()
+
+    models = args.models.split()
+    print(f"Starting fertility benchmark of {args.file} using {len(models)} tokenizers...")
+
+    tokenizers = load_tokenizers(models, args.lightweight_tokenizer)
+
+    if not tokenizers:
+        print("Error: No tokenizers were successfully loaded. Exiting.")
+        return
+
+    result = run_fertility_benchmark(tokenizers, iter_corpus_sentences(args.file), args.batch_size,
+                                     args.max_sentences)
+    result['corpus_file'] = os.path.abspath(args.file)
+    result['settings'] = {
+        'batch_size': args.batch_size,
+        'max_sentences': args.max_sentences,
+        'lightweight_tokenizer': args.lightweight_tokenizer,
+    }
+    result['timestamp'] = datetime.now().isoformat(timespec='seconds')
+
+    print_fertility_summary(result)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('corpus') != result['corpus']:
+            print("\nWarning: baseline was measured on a different corpus; ratios are not directly comparable")
+        result['comparison'] = compare_with_baseline(result, baseline)
+
+        print(f"\n=== Change vs. {args.baseline} ===")
+        for row in result['comparison']:
+            marker = '+' if row['improved'] else '-' if row['change_pct'] else ' '
+            print(f"{marker} {row['model']:<38} {row['metric']:<24} {row['baseline']:>12.4g} -> "
+                  f"{row['current']:>12.4g} ({row['change_pct']:+.1f}%)")
+
+    output_dir = os.path.dirname(args.output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output_file, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(f"\nResults saved to: {os.path.abspath(args.output_file)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,27 @@
+from __future__ import annotations
+
 import os
 import sys
 import argparse
-import pandas as pd
 import json
-from typing import List, Dict, Any
-from transformers import AutoTokenizer
-import matplotlib.pyplot as plt
-import seaborn as sns
+import copy
+import html
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Tuple, TYPE_CHECKING
 import codecs
 
+from stage_profiler import StageProfiler
+
+# transformers, pandas, matplotlib and seaborn are slow to import, so they are imported
+# by the functions that use them; annotations are postponed so type hints don't need them
+if TYPE_CHECKING:
+    import pandas as pd
+    from transformers import AutoTokenizer
+
 def decode_utf8_garbage(token):
     try:
         return bytes(token, 'latin1').decode('utf-8')
@@ -16,44 +29,333 @@ def decode_utf8_garbage(token):
         return token
 
 
-def load_tokenizers(model_ids: List[str]) -> Dict[str, AutoTokenizer]:
+def tokenizer_load_function(lightweight: bool = False, bundle_dir: str = None) -> Callable[[str], AutoTokenizer]:
+    """
+    Import the selected tokenizer loader and return the function that loads one model ID.
+    
+    Args:
+        lightweight: Build the tokenizer straight from its local tokenizer.json or
+            SentencePiece model instead of going through AutoTokenizer
+        bundle_dir: Load the tokenizer from this tokenizer_bundle.py bundle instead
+        
+    Returns:
+        Function taking a model ID and returning its tokenizer
+    """
+    if bundle_dir:
+        from tokenizer_bundle import load_bundle_tokenizer
+        return partial(load_bundle_tokenizer, bundle_dir)
+    if lightweight:
+        from tokenizer_loader import load_lightweight_tokenizer
+        return load_lightweight_tokenizer
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained
+
+
+def load_tokenizer_timed(load_tokenizer: Callable[[str], AutoTokenizer],
+                         model_id: str) -> Tuple[AutoTokenizer, float, float]:
+    """
+    Load one tokenizer and measure how long it took.
+    
+    Args:
+        load_tokenizer: Function from tokenizer_load_function that loads a model ID
+        model_id: Model ID to load the tokenizer for
+        
+    Returns:
+        Tuple of the tokenizer and its wall-clock and thread CPU load time in seconds
+    """
+    start = time.perf_counter()
+    start_cpu = time.thread_time()
+    tokenizer = load_tokenizer(model_id)
+    return tokenizer, time.perf_counter() - start, time.thread_time() - start_cpu
+
+
+def load_tokenizers(model_ids: List[str], lightweight: bool = False,
+                    profiler: StageProfiler = None, workers: int = None,
+                    bundle_dir: str = None) -> Dict[str, AutoTokenizer]:
     """
     Load tokenizers for the specified models.
     
+    Tokenizers are loaded concurrently on a thread pool, so file reads and Hub requests
+    of different models overlap, and each model's load time is printed as it finishes.
+    A model that fails to load is reported and skipped without holding up the others.
+    
     Args:
         model_ids: List of model IDs to load tokenizers for
+        lightweight: Build tokenizers straight from their local tokenizer.json or
+            SentencePiece model instead of going through AutoTokenizer
+        profiler: Optional StageProfiler recording a 'load_tokenizer' stage per model
+        workers: Number of loader threads (default: one per model)
+        bundle_dir: Load the tokenizers from this tokenizer_bundle.py bundle, with the
+            lightweight loader and without network access
         
     Returns:
-        Dictionary mapping model names to tokenizer objects
+        Dictionary mapping model names to tokenizer objects, in the order of model_ids
     """
-    tokenizers = {}
+    profiler = profiler or StageProfiler(enabled=False)
+    if not model_ids:
+        return {}
+    
+    # Resolve the loader here, so its imports (including transformers' lazy AutoTokenizer)
+    # happen once in the main thread rather than concurrently in the loader threads
+    load_tokenizer = tokenizer_load_function(lightweight, bundle_dir)
     
-    for model_id in model_ids:
-        model_name = model_id.split('/')[-1]
-        print(f"Loading tokenizer for {model_id}...")
+    start = time.perf_counter()
+    loaded = {}
+    
+    with ThreadPoolExecutor(max_workers=min(workers or len(model_ids), len(model_ids))) as executor:
+        futures = {}
+        for model_id in model_ids:
+            print(f"Loading tokenizer for {model_id}...")
+            futures[executor.submit(load_tokenizer_timed, load_tokenizer, model_id)] = model_id
         
-        try:
-            tokenizer = AutoTokenizer.from_pretrained(model_id)
-            tokenizers[model_name] = tokenizer
-            print(f"✓ Successfully loaded tokenizer for {model_name}")
-        except Exception as e:
-            print(f"✗ Failed to load tokenizer for {model_id}: {str(e)}")
+        for future in as_completed(futures):
+            model_id = futures[future]
+            model_name = model_id.split('/')[-1]
+            try:
+                tokenizer, seconds, cpu_seconds = future.result()
+            except Exception as e:
+                print(f"✗ Failed to load tokenizer for {model_id}: {str(e)}")
+                continue
+            loaded[model_id] = tokenizer
+            profiler.add_stage('load_tokenizer', model_name, seconds, cpu_seconds)
+            print(f"✓ Successfully loaded tokenizer for {model_name} ({seconds:.2f} s)")
     
-    return tokenizers
+    if len(model_ids) > 1:
+        print(f"Loaded {len(loaded)} of {len(model_ids)} tokenizers in {time.perf_counter() - start:.2f} s")
     
-from typing import Dict, List, Any
-from transformers import AutoTokenizer
+    return {model_id.split('/')[-1]: loaded[model_id] for model_id in model_ids if model_id in loaded}
+
+
+def fix_token_encoding(token: str) -> str:
+    """
+    If the token appears as garbled bytes (e.g. using byte-level BPE), try to re-encode it.
+    """
+    try:
+        # Try encoding as Latin-1 and decode as UTF-8
+        return token.encode('latin1').decode('utf-8')
+    except Exception:
+        return token
+
+
+# Number of sentences encoded per batched tokenizer call
+ENCODE_BATCH_SIZE = 1024
+
+# Maximum number of sentences per page of the combined HTML report
+REPORT_PAGE_SIZE = 1000
+
+# Default example sentences, separated by pipe character |
+DEFAULT_SENTENCES = (
+    'This is a test English sentence. |'
+    '다양한 토크나이저가 어떻게 처리하는지 보고 싶습니다. |'
+    '오늘은 날씨가 좋아서 산책하기 딱 좋아요. |'
+    '하늘이 정말 맑고 기분이 상쾌하네요. |'
+    '요즘 딥러닝 모델의 성능이 눈에 띄게 향상되고 있어요. |'
+    '하지만 그만큼 학습에 필요한 자원도 많이 필요하죠. |'
+    '저는 아침에 일어나자마자 커피를 마시는 습관이 있어요. |'
+    '하루를 시작할 때 커피 향이 꼭 필요하거든요. |'
+    '이 프로젝트는 처음부터 다시 계획을 세워야 할 것 같아요. |'
+    '기존의 방식으로는 효율이 너무 떨어져요. |'
+    '그 영화는 스토리도 좋았지만 배우들의 연기도 훌륭했어요. |'
+    '특히 주인공의 감정 표현이 인상 깊었어요. |'
+    '다음 주까지 보고서를 제출해야 한다는 걸 깜빡했어요. |'
+    '지금부터라도 열심히 작성해야겠네요. |'
+    '모든 조건을 만족하는 해를 찾는 건 쉽지 않은 일이에요. |'
+    '수학적으로도 굉장히 복잡한 문제거든요. |'
+    '회의 중에 갑자기 인터넷이 끊겨서 당황했어요. |'
+    '다행히 금방 다시 연결됐지만 중요한 내용을 놓쳤죠. |'
+    '친구들과 함께 떠난 여행은 정말 잊을 수 없는 추억이에요. |'
+    '자연 속에서 보낸 시간이 마음을 편안하게 해줬어요.'
+)
+
 
-def tokenize_sentences(tokenizers: Dict[str, AutoTokenizer], sentences: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+def build_tokenization_result(tokenizer: AutoTokenizer, sentence: str, token_ids: List[int],
+                              offsets: List[tuple], tokens: List[str],
+                              decoded_sentence: str) -> Dict[str, Any]:
+    """
+    Assemble the tokenization result for one sentence from its encoding.
+
+    Args:
+        tokenizer: Tokenizer object, used when offsets can't recover readable tokens.
+        sentence: Original sentence.
+        token_ids: Token IDs of the sentence.
+        offsets: Offset mapping of each token, or None if unavailable.
+        tokens: Tokenizer tokens of the sentence.
+        decoded_sentence: The sentence decoded from its token IDs (skipping special tokens).
+
+    Returns:
+        Tokenization result for the sentence, as described in tokenize_sentences.
+    """
+    readable_tokens = []
+
+    # Use offset mapping to extract original substrings if they exist.
+    if offsets:
+        for (start, end) in offsets:
+            # Some special tokens might have offset (0, 0)
+            if start == 0 and end == 0:
+                readable_tokens.append("")
+            else:
+                readable_tokens.append(sentence[start:end])
+    
+    # Fallback: decode individual tokens and try to clean them up
+    if not offsets or any(rt == "" for rt in readable_tokens):
+        # Attempt to convert tokens to string and fix encoding if needed
+        readable_tokens = [tokenizer.convert_tokens_to_string([tok]).strip() for tok in tokens]
+        readable_tokens = [fix_token_encoding(tok) for tok in readable_tokens]
+
+    # Create token mapping (token, token id, recovered readable text)
+    token_map = []
+    for tok, tok_id, read_tok in zip(tokens, token_ids, readable_tokens):
+        token_map.append({
+            "old_token": tok,
+            "token": read_tok,
+            "id": tok_id
+        })
+
+    return {
+        "sentence": sentence,
+        "old_tokens": tokens,
+        "token_ids": token_ids,
+        "tokens": readable_tokens,
+        "token_map": token_map,
+        "decoded_sentence": decoded_sentence
+    }
+
+
+def tokenize_sentence(tokenizer: AutoTokenizer, sentence: str) -> Dict[str, Any]:
+    """
+    Tokenize one sentence with one tokenizer while attempting to output readable Korean tokens.
+
+    Args:
+        tokenizer: Tokenizer object.
+        sentence: Sentence to tokenize.
+
+    Returns:
+        Tokenization result for the sentence, as described in tokenize_sentences.
+    """
+    # Get encoding with offset mapping if available.
+    encoding = tokenizer(sentence, return_offsets_mapping=True, add_special_tokens=True)
+    token_ids = encoding["input_ids"]
+    offsets = encoding.get("offset_mapping", None)
+    tokens = tokenizer.convert_ids_to_tokens(token_ids)
+
+    # Full decoded sentence (skips special tokens)
+    decoded_sentence = tokenizer.decode(token_ids, skip_special_tokens=True, clean_up_tokenization_spaces=True)
+
+    return build_tokenization_result(tokenizer, sentence, token_ids, offsets, tokens, decoded_sentence)
+
+
+def tokenize_batch(tokenizer: AutoTokenizer, sentences: List[str]) -> List[Dict[str, Any]]:
+    """
+    Tokenize a list of sentences with one batched encode call.
+
+    Fast tokenizers encode the whole batch in the Rust backend, which parallelizes internally;
+    offsets and tokens are taken from the batch encoding and the decoded sentences from one
+    batch_decode call. Other tokenizers fall back to tokenize_sentence per sentence.
+
+    Args:
+        tokenizer: Tokenizer object.
+        sentences: Sentences to tokenize.
+
+    Returns:
+        List of tokenization results, one per sentence, as described in tokenize_sentences.
+    """
+    if not getattr(tokenizer, 'is_fast', False) or not sentences:
+        return [tokenize_sentence(tokenizer, sentence) for sentence in sentences]
+
+    encoding = tokenizer(sentences, return_offsets_mapping=True, add_special_tokens=True)
+    all_token_ids = encoding["input_ids"]
+    all_offsets = encoding.get("offset_mapping", None) or [None] * len(sentences)
+
+    # Batch encodings of fast tokenizers carry the token strings already
+    encodings = getattr(encoding, 'encodings', None)
+    if encodings:
+        all_tokens = [sentence_encoding.tokens for sentence_encoding in encodings]
+    else:
+        all_tokens = [tokenizer.convert_ids_to_tokens(token_ids) for token_ids in all_token_ids]
+
+    # Full decoded sentences (skips special tokens)
+    decoded_sentences = tokenizer.batch_decode(all_token_ids, skip_special_tokens=True,
+                                               clean_up_tokenization_spaces=True)
+
+    return [build_tokenization_result(tokenizer, sentence, token_ids, offsets, tokens, decoded_sentence)
+            for sentence, token_ids, offsets, tokens, decoded_sentence
+            in zip(sentences, all_token_ids, all_offsets, all_tokens, decoded_sentences)]
+
+
+# Per-thread copy of the tokenizer used by tokenize_threaded worker threads
+_thread_state = threading.local()
+
+
+def init_tokenizer_thread(tokenizer: AutoTokenizer) -> None:
+    """
+    Give the calling worker thread its own copy of the tokenizer.
+
+    transformers tokenizers reconfigure their backend (truncation and padding) on every call,
+    so concurrent calls on one shared object are not safe; each thread encodes with a copy.
+
+    Args:
+        tokenizer: Tokenizer object to copy.
+    """
+    _thread_state.tokenizer = copy.deepcopy(tokenizer)
+
+
+def tokenize_batch_in_thread(sentences: List[str]) -> List[Dict[str, Any]]:
+    """Tokenize a batch with the calling worker thread's tokenizer copy."""
+    return tokenize_batch(_thread_state.tokenizer, sentences)
+
+
+def tokenize_threaded(tokenizer: AutoTokenizer, sentences: List[str], batch_size: int = ENCODE_BATCH_SIZE,
+                      threads: int = 1) -> List[Dict[str, Any]]:
+    """
+    Tokenize sentences with one tokenizer, encoding chunks concurrently on a thread pool.
+
+    Fast tokenizers release the GIL while encoding, so chunks overlap in the Rust backend.
+    Chunks hold at most batch_size sentences and are small enough to give every thread work;
+    results come back in sentence order.
+
+    Args:
+        tokenizer: Tokenizer object.
+        sentences: Sentences to tokenize.
+        batch_size: Maximum number of sentences per encode call.
+        threads: Number of worker threads; 1 encodes serially on the calling thread.
+
+    Returns:
+        List of tokenization results, one per sentence, as described in tokenize_sentences.
+    """
+    if threads <= 1 or len(sentences) <= 1:
+        results = []
+        for start in range(0, len(sentences), batch_size):
+            results.extend(tokenize_batch(tokenizer, sentences[start:start + batch_size]))
+        return results
+
+    chunk_size = min(batch_size, math.ceil(len(sentences) / threads))
+    chunks = [sentences[start:start + chunk_size] for start in range(0, len(sentences), chunk_size)]
+
+    results = []
+    with ThreadPoolExecutor(max_workers=min(threads, len(chunks)), initializer=init_tokenizer_thread,
+                            initargs=(tokenizer,)) as executor:
+        for chunk_results in executor.map(tokenize_batch_in_thread, chunks):
+            results.extend(chunk_results)
+    return results
+
+
+def tokenize_sentences(tokenizers: Dict[str, AutoTokenizer], sentences: List[str],
+                       batch_size: int = ENCODE_BATCH_SIZE, threads: int = 1,
+                       profiler: StageProfiler = None) -> Dict[str, List[Dict[str, Any]]]:
     """
     Tokenize each sentence with each tokenizer while attempting to output readable Korean tokens.
 
     This function uses offset mappings when available to extract the exact substrings from the original sentence.
     If offset mappings are not available or the result looks garbled, it falls back to re-encoding the tokens.
+    Sentences are encoded batch_size at a time with tokenize_batch, on threads worker threads
+    per tokenizer when threads > 1 (see tokenize_threaded).
 
     Args:
         tokenizers: Dictionary mapping model names to tokenizer objects.
         sentences: List of sentences to tokenize.
+        batch_size: Number of sentences per batched encode call.
+        threads: Number of worker threads encoding chunks concurrently.
+        profiler: Optional StageProfiler recording a 'tokenize' stage per model (items are sentences).
 
     Returns:
         Dictionary mapping model names to lists of tokenization results.
@@ -65,140 +367,220 @@ def tokenize_sentences(tokenizers: Dict[str, AutoTokenizer], sentences: List[str
           - 'token_map': list of mappings for each token with token string, readable text, and token id
           - 'decoded_sentence': the full sentence decoded from token IDs (skips special tokens)
     """
-
-    def fix_token_encoding(token: str) -> str:
-        """
-        If the token appears as garbled bytes (e.g. using byte-level BPE), try to re-encode it.
-        """
-        try:
-            # Try encoding as Latin-1 and decode as UTF-8
-            return token.encode('latin1').decode('utf-8')
-        except Exception:
-            return token
-
+    profiler = profiler or StageProfiler(enabled=False)
     tokenization_results = {}
 
     for model_name, tokenizer in tokenizers.items():
         print(f"\n--- Tokenizing with {model_name} ---")
-        model_results = []
-
-        for sentence in sentences:
-            # Get encoding with offset mapping if available.
-            encoding = tokenizer(sentence, return_offsets_mapping=True, add_special_tokens=True)
-            token_ids = encoding["input_ids"]
-            offsets = encoding.get("offset_mapping", None)
-            tokens = tokenizer.convert_ids_to_tokens(token_ids)
-            readable_tokens = []
-
-            # Use offset mapping to extract original substrings if they exist.
-            if offsets:
-                for (start, end) in offsets:
-                    # Some special tokens might have offset (0, 0)
-                    if start == 0 and end == 0:
-                        readable_tokens.append("")
-                    else:
-                        readable_tokens.append(sentence[start:end])
-            
-            # Fallback: decode individual tokens and try to clean them up
-            if not offsets or any(rt == "" for rt in readable_tokens):
-                # Attempt to convert tokens to string and fix encoding if needed
-                readable_tokens = [tokenizer.convert_tokens_to_string([tok]).strip() for tok in tokens]
-                readable_tokens = [fix_token_encoding(tok) for tok in readable_tokens]
-
-            # Create token mapping (token, token id, recovered readable text)
-            token_map = []
-            for tok, tok_id, read_tok in zip(tokens, token_ids, readable_tokens):
-                token_map.append({
-                    "old_token": tok,
-                    "token": read_tok,
-                    "id": tok_id
-                })
-
-            # Full decoded sentence (skips special tokens)
-            decoded_sentence = tokenizer.decode(token_ids, skip_special_tokens=True, clean_up_tokenization_spaces=True)
-
-            model_results.append({
-                "sentence": sentence,
-                "old_tokens": tokens,
-                "token_ids": token_ids,
-                "tokens": readable_tokens,
-                "token_map": token_map,
-                "decoded_sentence": decoded_sentence
-            })
-
-        tokenization_results[model_name] = model_results
+        with profiler.stage('tokenize', model_name, len(sentences)):
+            tokenization_results[model_name] = tokenize_threaded(tokenizer, sentences, batch_size, threads)
 
     return tokenization_results
 
 
-    return tokenization_results
+def iter_corpus_sentences(file_path: str) -> Iterator[str]:
+    """
+    Lazily read sentences from a text file (one per line), skipping empty lines.
+    
+    Args:
+        file_path: Path to the corpus file
+        
+    Yields:
+        Stripped sentences
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            sentence = line.strip()
+            if sentence:
+                yield sentence
+
+
+def iter_batches(items: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """
+    Group an iterable into lists of at most batch_size items.
+    
+    Args:
+        items: Items to group
+        batch_size: Maximum number of items per batch
+        
+    Yields:
+        Lists of consecutive items
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_tokenization(tokenizers: Dict[str, AutoTokenizer],
+                        sentences: Iterable[str],
+                        output_path: str,
+                        batch_size: int = 1000,
+                        profiler: StageProfiler = None) -> Dict[str, Dict[str, int]]:
+    """
+    Tokenize a stream of sentences in bounded batches and write results incrementally to JSONL.
+    
+    Only one batch of sentences and their results is held in memory at a time, so memory stays
+    flat regardless of corpus size. Each output line holds one sentence:
+    {"index": ..., "sentence": ..., "results": {model_name: <tokenize_sentences result>}}.
+    
+    Args:
+        tokenizers: Dictionary mapping model names to tokenizer objects
+        sentences: Iterable of sentences, e.g. from iter_corpus_sentences
+        output_path: Path of the JSONL file to write
+        batch_size: Number of sentences tokenized before results are written
+        profiler: Optional StageProfiler recording, summed over batches, a 'tokenize' stage per
+            model and a 'write_jsonl' stage (items are sentences)
+        
+    Returns:
+        Dictionary mapping model names to running totals of sentences, characters and tokens
+    """
+    profiler = profiler or StageProfiler(enabled=False)
+    totals = {model_name: {"sentences": 0, "characters": 0, "tokens": 0} for model_name in tokenizers}
+    sentence_idx = 0
+    
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for batch in iter_batches(sentences, batch_size):
+            batch_results = {}
+            for model_name, tokenizer in tokenizers.items():
+                with profiler.stage('tokenize', model_name, len(batch), accumulate=True):
+                    batch_results[model_name] = tokenize_batch(tokenizer, batch)
+            
+            with profiler.stage('write_jsonl', items=len(batch), accumulate=True):
+                for batch_idx, sentence in enumerate(batch):
+                    record = {
+                        "index": sentence_idx,
+                        "sentence": sentence,
+                        "results": {model_name: model_results[batch_idx]
+                                    for model_name, model_results in batch_results.items()}
+                    }
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    sentence_idx += 1
+            
+            for model_name, model_results in batch_results.items():
+                totals[model_name]["sentences"] += len(model_results)
+                totals[model_name]["characters"] += sum(len(result["sentence"]) for result in model_results)
+                totals[model_name]["tokens"] += sum(len(result["token_ids"]) for result in model_results)
+            
+            print(f"- Tokenized {sentence_idx:,} sentences")
+    
+    return totals
 
-def create_comparison_dataframe(tokenization_results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, pd.DataFrame]:
+
+def create_comparison_dataframe(tokenization_results: Dict[str, List[Dict[str, Any]]]) -> pd.DataFrame:
     """
-    Create comparison DataFrames for each sentence.
+    Create one long-format comparison table for all sentences.
+    
+    The table has one row per token, with columns sentence_idx, position (1-based), model,
+    token and id. It is built column by column from flat token arrays and sorted by sentence
+    (models and positions keep their order within a sentence), so sentence_comparison_view
+    can take any sentence as a cheap slice.
     
     Args:
         tokenization_results: Dictionary mapping model names to lists of tokenization results
         
     Returns:
-        Dictionary mapping sentence indices to DataFrames with comparison data
+        Long-format DataFrame with comparison data
     """
-    dataframes = {}
+    import numpy as np
+    import pandas as pd
     
-    # Get all model names
     model_names = list(tokenization_results.keys())
     
-    # Get the number of sentences
-    num_sentences = len(tokenization_results[model_names[0]])
+    sentence_idx_parts, position_parts, model_parts, tokens, ids = [], [], [], [], []
     
-    for sentence_idx in range(num_sentences):
-        sentence = tokenization_results[model_names[0]][sentence_idx]["sentence"]
-        
-        # Create a list to store rows for this sentence's comparison
-        rows = []
+    for model_code, model_name in enumerate(model_names):
+        results = tokenization_results[model_name]
+        lengths = np.fromiter((len(result["token_map"]) for result in results), dtype=np.int64, count=len(results))
+        starts = np.cumsum(lengths) - lengths
         
-        # Find the maximum number of tokens for this sentence across all models
-        max_tokens = max(len(tokenization_results[model_name][sentence_idx]["token_map"]) 
-                          for model_name in model_names)
-        
-        # Create a row for each token position
-        for token_idx in range(max_tokens):
-            row = {"Position": token_idx + 1}
-            
-            # Add token and ID for each model
-            for model_name in model_names:
-                token_map = tokenization_results[model_name][sentence_idx]["token_map"]
-                
-                if token_idx < len(token_map):
-                    row[f"{model_name}_Token"] = token_map[token_idx]["token"]
-                    row[f"{model_name}_ID"] = token_map[token_idx]["id"]
-                else:
-                    row[f"{model_name}_Token"] = ""
-                    row[f"{model_name}_ID"] = ""
-            
-            rows.append(row)
+        sentence_idx_parts.append(np.repeat(np.arange(len(results)), lengths))
+        position_parts.append(np.arange(lengths.sum()) - np.repeat(starts, lengths) + 1)
+        model_parts.append(np.full(lengths.sum(), model_code, dtype=np.int16))
+        for result in results:
+            for mapping in result["token_map"]:
+                tokens.append(mapping["token"])
+                ids.append(mapping["id"])
+    
+    sentence_idx = np.concatenate(sentence_idx_parts) if sentence_idx_parts else np.empty(0, dtype=np.int64)
+    order = np.argsort(sentence_idx, kind='stable')
+    
+    return pd.DataFrame({
+        "sentence_idx": sentence_idx[order],
+        "position": np.concatenate(position_parts)[order] if position_parts else np.empty(0, dtype=np.int64),
+        "model": pd.Categorical.from_codes(np.concatenate(model_parts)[order] if model_parts else [],
+                                           categories=model_names),
+        "token": np.array(tokens, dtype=object)[order],
+        "id": np.array(ids, dtype=np.int64)[order],
+    })
+
+
+def sentence_comparison_view(comparison_df: pd.DataFrame, sentence_idx: int) -> pd.DataFrame:
+    """
+    Get the side-by-side comparison for one sentence from the long-format comparison table.
+    
+    Rows are token positions with a Token and ID column per model; models with fewer tokens
+    are padded with empty strings.
+    
+    Args:
+        comparison_df: Long-format table from create_comparison_dataframe
+        sentence_idx: Index of the sentence
         
-        # Create DataFrame for this sentence
-        df = pd.DataFrame(rows)
-        dataframes[sentence_idx] = df
+    Returns:
+        DataFrame with Position, <model>_Token and <model>_ID columns
+    """
+    import numpy as np
+    import pandas as pd
     
-    return dataframes
+    # Rows are sorted by sentence, so the sentence is one contiguous slice
+    sentence_column = comparison_df["sentence_idx"].to_numpy()
+    start, end = np.searchsorted(sentence_column, [sentence_idx, sentence_idx + 1])
+    rows = comparison_df.iloc[start:end]
+    
+    model_names = list(comparison_df["model"].cat.categories)
+    model_codes = rows["model"].cat.codes.to_numpy()
+    tokens = rows["token"].to_numpy()
+    ids = rows["id"].to_numpy()
+    max_tokens = int(rows["position"].max()) if len(rows) else 0
+    
+    columns = {"Position": np.arange(1, max_tokens + 1)}
+    for model_code, model_name in enumerate(model_names):
+        in_model = model_codes == model_code
+        model_tokens, model_ids = tokens[in_model], ids[in_model]
+        padding = max_tokens - len(model_tokens)
+        if padding:
+            columns[f"{model_name}_Token"] = list(model_tokens) + [""] * padding
+            columns[f"{model_name}_ID"] = model_ids.tolist() + [""] * padding
+        else:
+            columns[f"{model_name}_Token"] = model_tokens
+            columns[f"{model_name}_ID"] = model_ids
+    
+    return pd.DataFrame(columns)
 
-def save_comparison_tables(dataframes: Dict[int, pd.DataFrame], 
+def save_comparison_tables(comparison_df: pd.DataFrame, 
                           sentences: List[str],
                           output_dir: str) -> None:
     """
-    Save comparison tables as HTML and CSV files.
+    Save the long-format comparison table as CSV, and a per-sentence table as HTML and CSV.
     
     Args:
-        dataframes: Dictionary mapping sentence indices to DataFrames
+        comparison_df: Long-format table from create_comparison_dataframe
         sentences: List of sentences
         output_dir: Directory to save the tables
     """
     os.makedirs(output_dir, exist_ok=True)
     
-    for sentence_idx, df in dataframes.items():
-        sentence = sentences[sentence_idx]
+    # All sentences in one table, keyed by sentence index, position and model
+    long_csv_path = os.path.join(output_dir, "token_comparison.csv")
+    comparison_df.to_csv(long_csv_path, index=False)
+    print(f"- Saved comparison for all sentences to {long_csv_path}")
+    
+    for sentence_idx, sentence in enumerate(sentences):
+        df = sentence_comparison_view(comparison_df, sentence_idx)
         safe_sentence = sentence[:30].replace(' ', '_').replace('.', '').replace(',', '')
         
         # Save as CSV
@@ -262,17 +644,75 @@ def save_comparison_tables(dataframes: Dict[int, pd.DataFrame],
         
         print(f"- Saved comparison for sentence {sentence_idx+1} to {html_path}")
 
-def create_combined_report(dataframes: Dict[int, pd.DataFrame], 
+def write_report_page(page_path: str,
+                      comparison_df: pd.DataFrame,
+                      sentences: List[str],
+                      sentence_indices: Iterable[int],
+                      css: str,
+                      navigation: str = "") -> None:
+    """
+    Write one combined report page, streaming each sentence's section to disk as it is rendered.
+    
+    Args:
+        page_path: Path of the HTML file to write
+        comparison_df: Long-format table from create_comparison_dataframe
+        sentences: List of sentences
+        sentence_indices: Indices of the sentences on this page
+        css: Style block for the page head
+        navigation: Optional HTML with links to the index and neighbouring pages
+    """
+    with open(page_path, 'w', encoding='utf-8') as f:
+        f.write(f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Tokenizer Comparison Report</title>
+        {css}
+    </head>
+    <body>
+        <h1>Tokenizer Comparison Report</h1>
+        <p>This report shows how different tokenizers process the same sentences.</p>
+    """)
+        f.write(navigation)
+        
+        # Add each sentence and its comparison table
+        for sentence_idx in sentence_indices:
+            df = sentence_comparison_view(comparison_df, sentence_idx)
+            
+            f.write(f"""
+        <div class="sentence-container">
+            <div class="sentence-text">Sentence {sentence_idx+1}: "{sentences[sentence_idx]}"</div>
+            {df.to_html(index=False)}
+        </div>
+        """)
+        
+        # Close the HTML content
+        f.write(navigation)
+        f.write("""
+    </body>
+    </html>
+    """)
+
+def create_combined_report(comparison_df: pd.DataFrame, 
                           sentences: List[str],
-                          output_dir: str) -> None:
+                          output_dir: str,
+                          page_size: int = REPORT_PAGE_SIZE) -> None:
     """
     Create a combined HTML report with all sentences.
     
+    Sections are streamed to disk one sentence at a time. With more than page_size sentences
+    the report is split into report_pages/page_<n>.html, and tokenizer_comparison_report.html
+    becomes an index page linking to them.
+    
     Args:
-        dataframes: Dictionary mapping sentence indices to DataFrames
+        comparison_df: Long-format table from create_comparison_dataframe
         sentences: List of sentences
         output_dir: Directory to save the report
+        page_size: Maximum number of sentences per report page, at least 1
     """
+    if page_size < 1:
+        raise ValueError(f"page_size must be a positive number of sentences, got {page_size}")
+    
     # Add CSS styling
     css = """
     <style>
@@ -331,8 +771,22 @@ def create_combined_report(dataframes: Dict[int, pd.DataFrame],
     </style>
     """
     
-    # Start building the HTML content
-    html_content = f"""
+    report_path = os.path.join(output_dir, "tokenizer_comparison_report.html")
+    
+    if len(sentences) <= page_size:
+        write_report_page(report_path, comparison_df, sentences, range(len(sentences)), css)
+        print(f"\nCombined report saved to: {report_path}")
+        return
+    
+    pages_dir = os.path.join(output_dir, "report_pages")
+    os.makedirs(pages_dir, exist_ok=True)
+    num_pages = math.ceil(len(sentences) / page_size)
+    
+    def page_name(page_num):
+        return f"page_{page_num:04d}.html"
+    
+    with open(report_path, 'w', encoding='utf-8') as index:
+        index.write(f"""
     <!DOCTYPE html>
     <html>
     <head>
@@ -341,32 +795,36 @@ def create_combined_report(dataframes: Dict[int, pd.DataFrame],
     </head>
     <body>
         <h1>Tokenizer Comparison Report</h1>
-        <p>This report shows how different tokenizers process the same sentences.</p>
+        <p>This report shows how different tokenizers process the same sentences.
+        {len(sentences):,} sentences are split across {num_pages:,} pages of up to {page_size:,} sentences.</p>
+        <ul>
+""")
+        
+        for page_num in range(1, num_pages + 1):
+            start = (page_num - 1) * page_size
+            end = min(start + page_size, len(sentences))
+            
+            links = ['<a href="../tokenizer_comparison_report.html">Index</a>']
+            if page_num > 1:
+                links.insert(0, f'<a href="{page_name(page_num - 1)}">Previous</a>')
+            if page_num < num_pages:
+                links.append(f'<a href="{page_name(page_num + 1)}">Next</a>')
+            navigation = f"""
+        <p>Page {page_num} of {num_pages}: {' | '.join(links)}</p>
     """
-    
-    # Add each sentence and its comparison table
-    for sentence_idx, df in dataframes.items():
-        sentence = sentences[sentence_idx]
+            
+            write_report_page(os.path.join(pages_dir, page_name(page_num)), comparison_df, sentences,
+                              range(start, end), css, navigation)
+            index.write(f"""        <li><a href="report_pages/{page_name(page_num)}">Sentences {start+1:,}-{end:,}</a>: {html.escape(sentences[start])}</li>
+""")
         
-        html_content += f"""
-        <div class="sentence-container">
-            <div class="sentence-text">Sentence {sentence_idx+1}: "{sentence}"</div>
-            {df.to_html(index=False)}
-        </div>
-        """
-    
-    # Close the HTML content
-    html_content += """
+        index.write("""
+        </ul>
     </body>
     </html>
-    """
+    """)
     
-    # Save the combined report
-    report_path = os.path.join(output_dir, "tokenizer_comparison_report.html")
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    print(f"\nCombined report saved to: {report_path}")
+    print(f"\nCombined report saved to: {report_path} ({num_pages} pages in {pages_dir})")
 
 def visualize_token_counts(tokenization_results: Dict[str, List[Dict[str, Any]]], 
                           sentences: List[str],
@@ -379,6 +837,10 @@ def visualize_token_counts(tokenization_results: Dict[str, List[Dict[str, Any]]]
         sentences: List of sentences
         output_dir: Directory to save the visualizations
     """
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
     # Extract token counts for each model and sentence
     model_names = list(tokenization_results.keys())
     token_counts = []
@@ -422,62 +884,123 @@ def visualize_token_counts(tokenization_results: Dict[str, List[Dict[str, Any]]]
     
     print(f"Token count visualization saved to: {plot_path}")
 
+def compute_token_overlap(tokenization_results: Dict[str, List[Dict[str, Any]]]) -> pd.DataFrame:
+    """
+    Compute pairwise token overlap between tokenizers for every sentence and for the whole corpus.
+    
+    Token strings are integer-encoded once across all models. Each model's sentence-by-token
+    incidence matrix is kept in sparse (COO) form as sorted, unique sentence * vocabulary + code
+    keys, so the overlap of a model pair for all sentences is one intersect1d and one bincount.
+    
+    Args:
+        tokenization_results: Dictionary mapping model names to lists of tokenization results
+        
+    Returns:
+        DataFrame with one row per model pair and sentence, plus corpus rows ('Sentence' is empty),
+        holding common tokens, tokens unique to each model and Jaccard similarity
+    """
+    import numpy as np
+    import pandas as pd
+    
+    model_names = list(tokenization_results.keys())
+    num_sentences = len(tokenization_results[model_names[0]])
+    
+    # Flatten every model's token strings, remembering each token's sentence
+    all_tokens = []
+    sentence_ids = []
+    model_bounds = [0]
+    for model_name in model_names:
+        results = tokenization_results[model_name]
+        lengths = np.fromiter((len(result["tokens"]) for result in results), dtype=np.int64, count=len(results))
+        sentence_ids.append(np.repeat(np.arange(num_sentences, dtype=np.int64), lengths))
+        for result in results:
+            all_tokens.extend(result["tokens"])
+        model_bounds.append(len(all_tokens))
+    
+    codes, vocabulary = pd.factorize(np.array(all_tokens, dtype=object))
+    vocab_size = max(len(vocabulary), 1)
+    
+    def sorted_unique(values):
+        # Sort-based dedupe; faster than np.unique's hashing path for these integer keys
+        values = np.sort(values)
+        return values[np.concatenate(([True], values[1:] != values[:-1]))] if len(values) else values
+    
+    # Sparse token sets: per sentence (keys) and for the whole corpus (codes)
+    sentence_sets = []
+    corpus_sets = []
+    for model_idx in range(len(model_names)):
+        model_codes = codes[model_bounds[model_idx]:model_bounds[model_idx + 1]]
+        sentence_sets.append(sorted_unique(sentence_ids[model_idx] * vocab_size + model_codes))
+        corpus_sets.append(sorted_unique(model_codes))
+    sentence_set_sizes = [np.bincount(keys // vocab_size, minlength=num_sentences) for keys in sentence_sets]
+    
+    def overlap_columns(common, size1, size2):
+        union = size1 + size2 - common
+        jaccard = np.divide(common, union, out=np.zeros(np.shape(common), dtype=np.float64), where=union > 0)
+        return {
+            "Common Tokens": common,
+            "Unique to Model 1": size1 - common,
+            "Unique to Model 2": size2 - common,
+            "Jaccard Similarity": jaccard,
+        }
+    
+    corpus_rows = []
+    sentence_tables = []
+    for i in range(len(model_names)):
+        for j in range(i + 1, len(model_names)):
+            common = np.intersect1d(sentence_sets[i], sentence_sets[j], assume_unique=True)
+            common_counts = np.bincount(common // vocab_size, minlength=num_sentences)
+            sentence_tables.append(pd.DataFrame({
+                "Sentence": pd.array(np.arange(1, num_sentences + 1), dtype="Int64"),
+                "Model 1": model_names[i],
+                "Model 2": model_names[j],
+                **overlap_columns(common_counts, sentence_set_sizes[i], sentence_set_sizes[j]),
+            }))
+            
+            corpus_common = len(np.intersect1d(corpus_sets[i], corpus_sets[j], assume_unique=True))
+            corpus_rows.append({
+                "Sentence": pd.NA,
+                "Model 1": model_names[i],
+                "Model 2": model_names[j],
+                **{name: value.item() for name, value in overlap_columns(
+                    np.array(corpus_common), np.array(len(corpus_sets[i])), np.array(len(corpus_sets[j]))).items()},
+            })
+    
+    if not corpus_rows:
+        return pd.DataFrame(columns=["Sentence", "Model 1", "Model 2", "Common Tokens", "Unique to Model 1",
+                                     "Unique to Model 2", "Jaccard Similarity"])
+    
+    # Corpus rows first, then sentences in order with model pairs in order within each sentence
+    sentence_df = pd.concat(sentence_tables, ignore_index=True)
+    sentence_df = sentence_df.sort_values("Sentence", kind="stable", ignore_index=True)
+    corpus_df = pd.DataFrame(corpus_rows).astype({"Sentence": "Int64"})
+    return pd.concat([corpus_df, sentence_df], ignore_index=True)
+
 def analyze_token_overlap(tokenization_results: Dict[str, List[Dict[str, Any]]],
                          sentences: List[str],
                          output_dir: str) -> None:
     """
-    Analyze token overlap between different tokenizers.
+    Analyze token overlap between different tokenizers and save it as one table.
+    
+    Writes token_overlap.csv with the corpus-wide overlap of each model pair (empty 'Sentence')
+    followed by the overlap of each model pair for every sentence (1-based 'Sentence').
     
     Args:
         tokenization_results: Dictionary mapping model names to lists of tokenization results
         sentences: List of sentences
         output_dir: Directory to save the analysis
     """
-    model_names = list(tokenization_results.keys())
-    num_models = len(model_names)
-    
     # Skip if only one model
-    if num_models <= 1:
+    if len(tokenization_results) <= 1:
         return
     
-    # For each sentence, analyze token overlap
-    for sentence_idx, sentence in enumerate(sentences):
-        overlap_data = []
-        
-        # Compare each pair of models
-        for i in range(num_models):
-            model1 = model_names[i]
-            tokens1 = set(tokenization_results[model1][sentence_idx]["tokens"])
-            
-            for j in range(i+1, num_models):
-                model2 = model_names[j]
-                tokens2 = set(tokenization_results[model2][sentence_idx]["tokens"])
-                
-                # Calculate intersection and unique tokens
-                common_tokens = tokens1.intersection(tokens2)
-                only_model1 = tokens1 - tokens2
-                only_model2 = tokens2 - tokens1
-                
-                # Calculate Jaccard similarity
-                jaccard = len(common_tokens) / len(tokens1.union(tokens2)) if tokens1 or tokens2 else 0
-                
-                overlap_data.append({
-                    "Model 1": model1,
-                    "Model 2": model2,
-                    "Common Tokens": len(common_tokens),
-                    "Unique to Model 1": len(only_model1),
-                    "Unique to Model 2": len(only_model2),
-                    "Jaccard Similarity": jaccard
-                })
-        
-        # Create DataFrame
-        overlap_df = pd.DataFrame(overlap_data)
-        
-        # Save as CSV
-        csv_path = os.path.join(output_dir, f"sentence_{sentence_idx+1}_token_overlap.csv")
-        overlap_df.to_csv(csv_path, index=False)
-        
-        print(f"- Token overlap analysis for sentence {sentence_idx+1} saved to {csv_path}")
+    overlap_df = compute_token_overlap(tokenization_results)
+    
+    # Save as CSV
+    csv_path = os.path.join(output_dir, "token_overlap.csv")
+    overlap_df.to_csv(csv_path, index=False)
+    
+    print(f"- Token overlap analysis for {len(sentences)} sentences saved to {csv_path}")
 
 def main():
     parser = argparse.ArgumentParser(
@@ -491,28 +1014,7 @@ def main():
     parser.add_argument(
         '--sentences',
         type=str,
-        default=(
-            'This is a test English sentence. |'
-            '다양한 토크나이저가 어떻게 처리하는지 보고 싶습니다. |'
-            '오늘은 날씨가 좋아서 산책하기 딱 좋아요. |'
-            '하늘이 정말 맑고 기분이 상쾌하네요. |'
-            '요즘 딥러닝 모델의 성능이 눈에 띄게 향상되고 있어요. |'
-            '하지만 그만큼 학습에 필요한 자원도 많이 필요하죠. |'
-            '저는 아침에 일어나자마자 커피를 마시는 습관이 있어요. |'
-            '하루를 시작할 때 커피 향이 꼭 필요하거든요. |'
-            '이 프로젝트는 처음부터 다시 계획을 세워야 할 것 같아요. |'
-            '기존의 방식으로는 효율이 너무 떨어져요. |'
-            '그 영화는 스토리도 좋았지만 배우들의 연기도 훌륭했어요. |'
-            '특히 주인공의 감정 표현이 인상 깊었어요. |'
-            '다음 주까지 보고서를 제출해야 한다는 걸 깜빡했어요. |'
-            '지금부터라도 열심히 작성해야겠네요. |'
-            '모든 조건을 만족하는 해를 찾는 건 쉽지 않은 일이에요. |'
-            '수학적으로도 굉장히 복잡한 문제거든요. |'
-            '회의 중에 갑자기 인터넷이 끊겨서 당황했어요. |'
-            '다행히 금방 다시 연결됐지만 중요한 내용을 놓쳤죠. |'
-            '친구들과 함께 떠난 여행은 정말 잊을 수 없는 추억이에요. |'
-            '자연 속에서 보낸 시간이 마음을 편안하게 해줬어요.'
-        ),
+        default=DEFAULT_SENTENCES,
         help="Sentences to tokenize, separated by pipe character |"
     )
     
@@ -522,8 +1024,44 @@ def main():
     parser.add_argument('--file', type=str, 
                         help="Path to a text file containing sentences (one per line)")
     
+    parser.add_argument('--stream', action='store_true',
+                        help="Stream the --file corpus in batches and write results to JSONL instead of building reports")
+    
+    parser.add_argument('--batch_size', type=int, default=1000,
+                        help="Number of sentences per batch in --stream mode (default: 1000)")
+    
+    parser.add_argument('--lightweight_tokenizer', action='store_true',
+                        help="Load tokenizers straight from their local tokenizer.json or SentencePiece model "
+                             "instead of AutoTokenizer")
+    
+    parser.add_argument('--bundle', type=str, default=None,
+                        help="Load the tokenizers from a bundle packed with tokenizer_bundle.py")
+    
+    parser.add_argument('--report_page_size', type=int, default=REPORT_PAGE_SIZE,
+                        help="Split the combined HTML report into pages with an index above this many sentences "
+                             f"(default: {REPORT_PAGE_SIZE})")
+    
+    parser.add_argument('--threads', type=int, default=1,
+                        help="Number of threads encoding sentence chunks concurrently per tokenizer "
+                             "(default: 1; not used with --stream)")
+    
+    parser.add_argument('--profile', action='store_true',
+                        help="Record wall time, CPU time, peak memory and throughput of each stage and model "
+                             "and write them to <output_dir>/profile_trace.json")
+    
     args = parser.parse_args()
     
+    if args.report_page_size < 1:
+        parser.error("--report_page_size must be at least 1")
+    
+    profiler = StageProfiler(enabled=args.profile)
+    
+    if args.stream:
+        if not args.file:
+            parser.error("--stream requires --file")
+        stream_main(args, profiler)
+        return
+    
     # Get sentences either from command line or file
     if args.file:
         with open(args.file, 'r', encoding='utf-8') as f:
@@ -540,36 +1078,85 @@ def main():
     print(f"Starting tokenization analysis for {len(sentences)} sentences using {len(models)} tokenizers...")
     
     # Load tokenizers
-    tokenizers = load_tokenizers(models)
+    with profiler.stage('load_tokenizers', items=len(models)):
+        tokenizers = load_tokenizers(models, args.lightweight_tokenizer, profiler, bundle_dir=args.bundle)
     
     if not tokenizers:
         print("Error: No tokenizers were successfully loaded. Exiting.")
         return
     
     # Tokenize sentences
-    tokenization_results = tokenize_sentences(tokenizers, sentences)
+    tokenization_results = tokenize_sentences(tokenizers, sentences, threads=args.threads, profiler=profiler)
     
     # Create comparison DataFrames
     print("\nCreating comparison tables...")
-    comparison_dfs = create_comparison_dataframe(tokenization_results)
+    with profiler.stage('comparison_dataframe', items=len(sentences)):
+        comparison_df = create_comparison_dataframe(tokenization_results)
     
     # Save comparison tables
     print("\nSaving comparison tables:")
-    save_comparison_tables(comparison_dfs, sentences, args.output_dir)
+    with profiler.stage('comparison_tables', items=len(sentences)):
+        save_comparison_tables(comparison_df, sentences, args.output_dir)
     
     # Create combined report
-    create_combined_report(comparison_dfs, sentences, args.output_dir)
+    with profiler.stage('combined_report', items=len(sentences)):
+        create_combined_report(comparison_df, sentences, args.output_dir, args.report_page_size)
     
     # Visualize token counts
     print("\nGenerating visualizations...")
-    visualize_token_counts(tokenization_results, sentences, args.output_dir)
+    with profiler.stage('charts', items=len(sentences)):
+        visualize_token_counts(tokenization_results, sentences, args.output_dir)
     
     # Analyze token overlap
     print("\nAnalyzing token overlap...")
-    analyze_token_overlap(tokenization_results, sentences, args.output_dir)
+    with profiler.stage('token_overlap', items=len(sentences)):
+        analyze_token_overlap(tokenization_results, sentences, args.output_dir)
+    
+    if args.profile:
+        profiler.print_summary()
+        profiler.save_trace(os.path.join(args.output_dir, 'profile_trace.json'), 'generate_examples', vars(args))
     
     print(f"\nAnalysis complete! All results saved to: {os.path.abspath(args.output_dir)}")
     print(f"To view the full comparison report, open: {os.path.join(os.path.abspath(args.output_dir), 'tokenizer_comparison_report.html')}")
 
+def stream_main(args: argparse.Namespace, profiler: StageProfiler = None) -> None:
+    """
+    Run the streaming corpus mode: tokenize --file lazily and write results to JSONL.
+    
+    Args:
+        args: Parsed command line arguments
+        profiler: Optional StageProfiler; its trace is saved when args.profile is set
+    """
+    profiler = profiler or StageProfiler(enabled=False)
+    models = args.models.split()
+    
+    print(f"Starting streaming tokenization of {args.file} using {len(models)} tokenizers...")
+    
+    # Load tokenizers
+    with profiler.stage('load_tokenizers', items=len(models)):
+        tokenizers = load_tokenizers(models, args.lightweight_tokenizer, profiler, bundle_dir=args.bundle)
+    
+    if not tokenizers:
+        print("Error: No tokenizers were successfully loaded. Exiting.")
+        return
+    
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir, "tokenization_results.jsonl")
+    
+    totals = stream_tokenization(tokenizers, iter_corpus_sentences(args.file), output_path, args.batch_size,
+                                 profiler)
+    
+    print("\n=== Streaming Tokenization Summary ===")
+    for model_name, model_totals in totals.items():
+        tokens_per_char = model_totals["tokens"] / model_totals["characters"] if model_totals["characters"] else 0
+        print(f"{model_name}: {model_totals['sentences']:,} sentences, {model_totals['tokens']:,} tokens "
+              f"({tokens_per_char:.3f} tokens/char)")
+    
+    print(f"\nTokenization results saved to: {os.path.abspath(output_path)}")
+    
+    if args.profile:
+        profiler.print_summary()
+        profiler.save_trace(os.path.join(args.output_dir, 'profile_trace.json'), 'generate_examples', vars(args))
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
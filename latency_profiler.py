@@ -0,0 +1,235 @@
+import os
+import argparse
+import json
+import time
+import resource
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any
+
+import numpy as np
+
+from generate_examples import load_tokenizers, iter_corpus_sentences, DEFAULT_SENTENCES
+
+# Batch sizes measured for batched throughput by default
+DEFAULT_BATCH_SIZES = [1, 8, 32, 128, 512]
+
+# Single-sentence encodes run before timing, so latency excludes first-call setup
+WARMUP_ENCODES = 10
+
+
+def current_rss_mb() -> float:
+    """Return the resident memory of this process in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        # ru_maxrss is in KB on Linux and bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss / (1024 * 1024) if os.uname().sysname == 'Darwin' else max_rss / 1024
+
+
+def measure_latency(tokenizer, sentences: List[str]) -> Dict[str, float]:
+    """
+    Measure single-sentence encode latency.
+
+    Args:
+        tokenizer: Tokenizer object
+        sentences: Sentences to encode one at a time
+
+    Returns:
+        Dictionary with p50/p95/p99/mean latency in milliseconds
+    """
+    for sentence in sentences[:WARMUP_ENCODES]:
+        tokenizer(sentence)
+
+    latencies_ns = np.empty(len(sentences), dtype=np.int64)
+    for i, sentence in enumerate(sentences):
+        start = time.perf_counter_ns()
+        tokenizer(sentence)
+        latencies_ns[i] = time.perf_counter_ns() - start
+
+    p50, p95, p99 = np.percentile(latencies_ns, [50, 95, 99]) / 1e6
+    return {
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'mean_ms': float(latencies_ns.mean() / 1e6),
+    }
+
+
+def measure_throughput(tokenizer, sentences: List[str], batch_size: int) -> Dict[str, float]:
+    """
+    Measure batched encode throughput at one batch size.
+
+    Args:
+        tokenizer: Tokenizer object
+        sentences: Sentences to encode
+        batch_size: Number of sentences per encode call
+
+    Returns:
+        Dictionary with sentences and tokens encoded per second
+    """
+    tokenizer(sentences[:batch_size])
+
+    tokens = 0
+    start = time.perf_counter()
+    for begin in range(0, len(sentences), batch_size):
+        token_ids = tokenizer(sentences[begin:begin + batch_size])["input_ids"]
+        tokens += sum(len(ids) for ids in token_ids)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'batch_size': batch_size,
+        'sentences_per_sec': len(sentences) / elapsed if elapsed else 0,
+        'tokens_per_sec': tokens / elapsed if elapsed else 0,
+    }
+
+
+def profile_model(model_id: str, sentences: List[str], batch_sizes: List[int],
+                  lightweight: bool = False) -> Dict[str, Any]:
+    """
+    Load one tokenizer and profile its load cost, encode latency and batched throughput.
+
+    Meant to run in a freshly spawned process, so the load time includes importing the
+    tokenizer libraries and the resident memory belongs to this tokenizer alone.
+
+    Args:
+        model_id: Model ID or local tokenizer directory
+        sentences: Sentences used for latency and throughput measurements
+        batch_sizes: Batch sizes for the throughput measurements
+        lightweight: Load the tokenizer with the lightweight loader instead of AutoTokenizer
+
+    Returns:
+        Profile dictionary for the model, or None if the tokenizer failed to load
+    """
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    tokenizers = load_tokenizers([model_id], lightweight)
+    load_seconds = time.perf_counter() - start
+
+    if not tokenizers:
+        return None
+
+    model_name, tokenizer = next(iter(tokenizers.items()))
+    rss_after = current_rss_mb()
+
+    return {
+        'model': model_name,
+        'model_id': model_id,
+        'load_seconds': load_seconds,
+        'rss_after_load_mb': rss_after,
+        'rss_load_delta_mb': rss_after - rss_before,
+        'latency': measure_latency(tokenizer, sentences),
+        'throughput': [measure_throughput(tokenizer, sentences, batch_size) for batch_size in batch_sizes],
+    }
+
+
+def profile_tokenizers(model_ids: List[str], sentences: List[str], batch_sizes: List[int] = None,
+                       lightweight: bool = False) -> List[Dict[str, Any]]:
+    """
+    Profile each tokenizer in its own spawned process, one model at a time.
+
+    Args:
+        model_ids: List of model IDs to profile
+        sentences: Sentences used for latency and throughput measurements
+        batch_sizes: Batch sizes for the throughput measurements (default: DEFAULT_BATCH_SIZES)
+        lightweight: Load tokenizers with the lightweight loader instead of AutoTokenizer
+
+    Returns:
+        List of profile dictionaries for the tokenizers that loaded
+    """
+    batch_sizes = batch_sizes or DEFAULT_BATCH_SIZES
+    context = multiprocessing.get_context('spawn')
+
+    profiles = []
+    for model_id in model_ids:
+        print(f"\nProfiling {model_id}...")
+        # A fresh interpreter per model keeps the load cold and the memory readings separate
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            profile = executor.submit(profile_model, model_id, sentences, batch_sizes, lightweight).result()
+        if profile is not None:
+            profiles.append(profile)
+    return profiles
+
+
+def print_latency_summary(profiles: List[Dict[str, Any]]):
+    """Print load cost, latency percentiles and batched throughput for each model."""
+    print("\n=== Tokenizer Latency Profile ===")
+    print(f"{'Model':<40} {'Load':>8} {'RSS':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for profile in profiles:
+        latency = profile['latency']
+        print(f"{profile['model']:<40} {profile['load_seconds']:>6.2f} s {profile['rss_after_load_mb']:>6.0f} MB "
+              f"{latency['p50_ms']:>6.3f} ms {latency['p95_ms']:>6.3f} ms {latency['p99_ms']:>6.3f} ms")
+
+    print(f"\n{'Model':<40} {'Batch':>6} {'Sentences/s':>14} {'Tokens/s':>14}")
+    for profile in profiles:
+        for throughput in profile['throughput']:
+            print(f"{profile['model']:<40} {throughput['batch_size']:>6} {throughput['sentences_per_sec']:>14,.0f} "
+                  f"{throughput['tokens_per_sec']:>14,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tokenizer Latency Profiler - load cost, encode latency percentiles and batched throughput")
+
+    parser.add_argument('--models', type=str,
+                        default='meta-llama/Llama-4-Maverick-17B-128E meta-llama/Llama-4-Scout-17B-16E'
+                        ' deepseek-ai/DeepSeek-V3-0324 Qwen/QwQ-32B mistralai/Mistral-Small-3.1-24B-Base-2503 google/gemma-3-27b-it',
+                        help="List of model IDs to profile")
+    parser.add_argument('--file', type=str, default=None,
+                        help="Path to a text file containing sentences (one per line); "
+                             "defaults to the example sentences of generate_examples.py")
+    parser.add_argument('--num_sentences', type=int, default=1000,
+                        help="Number of sentences to read from --file (default: 1000)")
+    parser.add_argument('--batch_sizes', type=str, default=' '.join(str(size) for size in DEFAULT_BATCH_SIZES),
+                        help="Batch sizes for the throughput measurements, separated by spaces")
+    parser.add_argument('--output_file', type=str, default="results/latency_profile.json",
+                        help="Path to save the profile (default: results/latency_profile.json); "
+                             "pass it to run_analyzer.py --latency_profile to include it in the reports")
+    parser.add_argument('--lightweight_tokenizer', action='store_true',
+                        help="Load tokenizers straight from their local tokenizer.json or SentencePiece model "
+                             "instead of AutoTokenizer")
+
+    args = parser.parse_args()
+
+    if args.file:
+        sentences = []
+        for sentence in iter_corpus_sentences(args.file):
+            if len(sentences) >= args.num_sentences:
+                break
+            sentences.append(sentence)
+    else:
+        sentences = [sentence.strip() for sentence in DEFAULT_SENTENCES.split('|')]
+
+    models = args.models.split()
+    batch_sizes = [int(size) for size in args.batch_sizes.split()]
+    print(f"Profiling {len(models)} tokenizers on {len(sentences)} sentences...")
+
+    profiles = profile_tokenizers(models, sentences, batch_sizes, args.lightweight_tokenizer)
+
+    if not profiles:
+        print("Error: No tokenizers were successfully loaded. Exiting.")
+        return
+
+    print_latency_summary(profiles)
+
+    output_dir = os.path.dirname(args.output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'sentences': len(sentences),
+            'sentence_file': os.path.abspath(args.file) if args.file else None,
+            'lightweight_tokenizer': args.lightweight_tokenizer,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'models': profiles,
+        }, f, ensure_ascii=False, indent=2)
+
+    print(f"\nResults saved to: {os.path.abspath(args.output_file)}")
+
+
+if __name__ == "__main__":
+    main()
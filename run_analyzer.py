@@ -1,43 +1,293 @@
+from __future__ import annotations
+
 import os
 import sys
 import argparse
 import json
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import List, Dict, Any
-from token_analyzer import token_analysis 
+import hashlib
+import shutil
+import io
+import contextlib
+import tempfile
+import importlib.util
+import importlib.metadata
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Tuple, TYPE_CHECKING
+from token_analyzer import token_analysis, decode_token_masks, analysis_output_files, TOKEN_ID_FILES, \
+    HANGUL_SYLLABLE_COUNT
+from tokenizer_loader import find_tokenizer_file
+from stage_profiler import StageProfiler
 import numpy as np
 
-def run_analysis_for_models(model_ids: List[str], output_dir: str = "tokenizer_analysis_results"):
+# pandas, matplotlib and seaborn are slow to import, so they are imported by the
+# functions that use them; annotations are postponed so type hints don't need them
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Files that determine a tokenizer's vocabulary and decoding behaviour
+TOKENIZER_FILES = [
+    'tokenizer.json',
+    'tokenizer_config.json',
+    'special_tokens_map.json',
+    'added_tokens.json',
+    'vocab.json',
+    'vocab.txt',
+    'merges.txt',
+    'tokenizer.model',
+]
+
+# Bump when the analysis output changes so stale cache entries are not reused
+ANALYSIS_CACHE_VERSION = 4
+
+# Libraries whose decoding behaviour the analysis depends on; their versions are part of the cache key
+DECODING_LIBRARIES = ['transformers', 'tokenizers', 'sentencepiece']
+
+
+def resolve_tokenizer_files(model_id: str) -> List[str]:
+    """
+    Find the local tokenizer files for a model without touching the network.
+    
+    Args:
+        model_id: Local tokenizer directory or HuggingFace model ID
+    
+    Returns:
+        List of paths to the tokenizer files that exist locally
+    """
+    paths = [find_tokenizer_file(model_id, filename) for filename in TOKENIZER_FILES]
+    return [path for path in paths if path is not None]
+
+
+def decoding_library_versions() -> str:
+    """
+    Return the installed versions of DECODING_LIBRARIES, read from package metadata.
+    
+    The packages are not imported, so computing a cache key stays cheap.
+    """
+    versions = []
+    for library in DECODING_LIBRARIES:
+        try:
+            versions.append(f"{library}={importlib.metadata.version(library)}")
+        except importlib.metadata.PackageNotFoundError:
+            versions.append(f"{library}=none")
+    return ';'.join(versions)
+
+
+def compute_analysis_cache_key(model_id: str, min_token_id: int = 102, lightweight: bool = False) -> str:
+    """
+    Compute a content hash of a model's tokenizer files and analysis settings.
+    
+    The versions of the decoding libraries are hashed too, since decoded strings can change
+    between releases; upgrading them invalidates the cache. The model ID is part of the key
+    because results name their model, so models with identical tokenizer files (e.g. sizes
+    of one model family) get separate entries.
+    
+    Args:
+        model_id: Local tokenizer directory or HuggingFace model ID
+        min_token_id: Minimum token ID passed to the analysis
+        lightweight: Whether the analysis uses the lightweight tokenizer loader
+    
+    Returns:
+        Hex digest identifying the analysis result, or None if no tokenizer files are available locally
+    """
+    paths = resolve_tokenizer_files(model_id)
+    if not paths:
+        return None
+    
+    digest = hashlib.sha256()
+    digest.update(f"version={ANALYSIS_CACHE_VERSION};model_id={model_id};min_token_id={min_token_id};"
+                  f"{decoding_library_versions()}".encode('utf-8'))
+    if lightweight:
+        digest.update(b";loader=lightweight")
+    for path in paths:
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_result_model_id(cache_file: str) -> str:
+    """Return the model ID recorded in a cached analysis result, or None if it can't be read."""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get('model_id')
+    except (OSError, ValueError):
+        return None
+
+
+def analyze_model_captured(model_id: str, output_file: str, min_token_id: int = 102,
+                           shard_workers: int = 1, lightweight: bool = False,
+                           token_table_file: str = None, profile: bool = False,
+                           token_id_dir: str = '.') -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Run token analysis for one model with its console output captured.
+    
+    Used by the process pool so each model's log can be printed as one block.
+    
+    Args:
+        model_id: Model ID to analyze
+        output_file: Path to save the analysis result
+        min_token_id: Minimum token ID to analyze
+        shard_workers: Number of worker processes used for the model's vocabulary shards
+        lightweight: Whether to use the lightweight tokenizer loader
+        token_table_file: Optional path to save the model's Parquet token table
+        profile: Whether to record the analysis stages of the model
+        token_id_dir: Directory to write the model's token ID files to
+    
+    Returns:
+        Everything the analysis printed to stdout and stderr, and the stage records
+        (empty unless profile is True)
+    """
+    profiler = StageProfiler(enabled=profile)
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+        token_analysis(model_id, output_file, min_token_id, shard_workers, lightweight, token_table_file,
+                       profiler, token_id_dir=token_id_dir)
+    return buffer.getvalue(), profiler.records
+
+
+def run_analysis_for_models(model_ids: List[str], output_dir: str = "tokenizer_analysis_results",
+                            min_token_id: int = 102, cache_dir: str = None, use_cache: bool = True,
+                            workers: int = 1, shard_workers: int = 1, lightweight: bool = False,
+                            token_tables: bool = False, profiler: StageProfiler = None):
     """
     Run tokenizer analysis for multiple models and save results to specified directory.
     
+    Results are cached by a hash of each model's tokenizer files, min_token_id and the
+    decoding library versions, so models whose tokenizer has not changed are loaded from
+    the cache instead of re-analyzed.
+    With workers > 1 the remaining models are analyzed in a process pool; each model's
+    console output is captured and printed as one block, in the order of model_ids.
+    Workers write their token ID files to a staging directory of their own, and they are
+    copied to the working directory in the order of model_ids, as in a serial run.
+    With token_tables=True each model's Parquet token table is also written to
+    <output_dir>/token_tables/<model>.parquet and cached next to its analysis result.
+    The category token files (tokens/<model>_*.json) and token ID files written to the
+    working directory are cached too and restored on a cache hit, so a cached run leaves
+    the same files as a fresh one; the token ID files are those of the last model.
+    A profiler records each model's analysis stages, including those run in worker processes.
+    
     Args:
         model_ids: List of model IDs to analyze
         output_dir: Directory to save individual analysis results
+        min_token_id: Minimum token ID to analyze
+        cache_dir: Directory holding cached analysis results (default: <output_dir>/analysis_cache)
+        use_cache: Whether to read and write the analysis cache
+        workers: Number of worker processes used to analyze models in parallel
+        shard_workers: Number of worker processes used within each model for vocabulary shards
+        lightweight: Whether to load tokenizers with the lightweight loader instead of AutoTokenizer
+        token_tables: Whether to also write a Parquet token table per model
+        profiler: Optional StageProfiler recording the stages of each model
     
     Returns:
-        List of paths to the analysis result files
+        List of paths to the analysis result files, in the order of model_ids
     """
+    profiler = profiler or StageProfiler(enabled=False)
+    
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
+    if cache_dir is None:
+        cache_dir = os.path.join(output_dir, "analysis_cache")
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    token_table_dir = os.path.join(output_dir, "token_tables")
+    if token_tables:
+        os.makedirs(token_table_dir, exist_ok=True)
+    
     result_files = []
+    pending = []
+    cached_files_dirs = {}
     
-    # Run analysis for each model
+    def restore_cached_files(model_id, files_dir, names):
+        output_files = analysis_output_files(model_id)
+        for name in names:
+            if os.path.dirname(output_files[name]):
+                os.makedirs(os.path.dirname(output_files[name]), exist_ok=True)
+            shutil.copyfile(os.path.join(files_dir, name), output_files[name])
+    
+    # Reuse cached results where the tokenizer has not changed
     for model_id in model_ids:
         model_name = model_id.split('/')[-1]
         output_file = os.path.join(output_dir, f"{model_name}_analysis.json")
+        result_files.append(output_file)
+        token_table_file = os.path.join(token_table_dir, f"{model_name}.parquet") if token_tables else None
+        
+        with profiler.stage('cache_lookup', model_name):
+            cache_key = compute_analysis_cache_key(model_id, min_token_id, lightweight) if use_cache else None
+            cached = False
+            if cache_key is not None:
+                cache_file = os.path.join(cache_dir, f"{cache_key}.json")
+                cache_table = os.path.join(cache_dir, f"{cache_key}.parquet")
+                cache_files_dir = os.path.join(cache_dir, f"{cache_key}_files")
+                # A result of another model must never be restored under this model's name
+                if os.path.exists(cache_file) and os.path.isdir(cache_files_dir) \
+                        and (not token_tables or os.path.exists(cache_table)) \
+                        and cached_result_model_id(cache_file) == model_id:
+                    shutil.copyfile(cache_file, output_file)
+                    if token_tables:
+                        shutil.copyfile(cache_table, token_table_file)
+                    restore_cached_files(model_id, cache_files_dir, analysis_output_files(model_id))
+                    cached_files_dirs[model_id] = cache_files_dir
+                    print(f"Using cached analysis for {model_id} ({cache_key[:12]})")
+                    cached = True
+        if cached:
+            continue
         
+        pending.append((model_id, output_file, token_table_file, cache_key))
+    
+    def store_in_cache(model_id, output_file, token_table_file, cache_key, token_id_dir='.'):
+        # The tokenizer files are only guaranteed to be local after the first load
+        if use_cache:
+            cache_key = cache_key or compute_analysis_cache_key(model_id, min_token_id, lightweight)
+            if cache_key is not None:
+                shutil.copyfile(output_file, os.path.join(cache_dir, f"{cache_key}.json"))
+                if token_table_file:
+                    shutil.copyfile(token_table_file, os.path.join(cache_dir, f"{cache_key}.parquet"))
+                cache_files_dir = os.path.join(cache_dir, f"{cache_key}_files")
+                os.makedirs(cache_files_dir, exist_ok=True)
+                for name, path in analysis_output_files(model_id, token_id_dir).items():
+                    shutil.copyfile(path, os.path.join(cache_files_dir, name))
+    
+    def print_header(model_id):
         print(f"\n{'='*80}")
         print(f"Analyzing tokenizer: {model_id}")
         print(f"{'='*80}")
-        
-        # Run analysis
-        token_analysis(model_id, output_file)
-        
-        result_files.append(output_file)
+    
+    if workers > 1 and len(pending) > 1:
+        print(f"Analyzing {len(pending)} tokenizers with {min(workers, len(pending))} worker processes...")
+        with tempfile.TemporaryDirectory() as staging_dir, \
+                ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            token_id_dirs = [os.path.join(staging_dir, str(index)) for index in range(len(pending))]
+            for token_id_dir in token_id_dirs:
+                os.makedirs(token_id_dir)
+            futures = [executor.submit(analyze_model_captured, model_id, output_file, min_token_id,
+                                       shard_workers, lightweight, token_table_file, profiler.enabled, token_id_dir)
+                       for (model_id, output_file, token_table_file, _), token_id_dir in zip(pending, token_id_dirs)]
+            
+            # Collect in submission order so the console output and the token ID files left
+            # in the working directory are those of a serial run
+            for (model_id, output_file, token_table_file, cache_key), token_id_dir, future in \
+                    zip(pending, token_id_dirs, futures):
+                log, records = future.result()
+                print_header(model_id)
+                print(log, end='')
+                profiler.add_records(records)
+                for filename in TOKEN_ID_FILES:
+                    shutil.copyfile(os.path.join(token_id_dir, filename), filename)
+                store_in_cache(model_id, output_file, token_table_file, cache_key, token_id_dir)
+    else:
+        # Run analysis for each model
+        for model_id, output_file, token_table_file, cache_key in pending:
+            print_header(model_id)
+            token_analysis(model_id, output_file, min_token_id, shard_workers, lightweight, token_table_file,
+                           profiler)
+            store_in_cache(model_id, output_file, token_table_file, cache_key)
+    
+    # Analyses run after the cache lookup overwrote the token ID files of a cached last model
+    if pending and model_ids[-1] in cached_files_dirs:
+        restore_cached_files(model_ids[-1], cached_files_dirs[model_ids[-1]], TOKEN_ID_FILES)
     
     return result_files
 
@@ -71,6 +321,8 @@ def create_comparison_dataframe(results: List[Dict[str, Any]]) -> pd.DataFrame:
     Returns:
         DataFrame with comparison data
     """
+    import pandas as pd
+    
     comparison_data = []
     
     for result in results:
@@ -92,6 +344,10 @@ def create_comparison_dataframe(results: List[Dict[str, Any]]) -> pd.DataFrame:
             'Special Chars (%)': round(stats['special_char'] / stats['total_tokens'] * 100, 2),
             'Uncategorized': stats['uncategorized'],
             'Uncategorized (%)': round(stats['uncategorized'] / stats['total_tokens'] * 100, 2),
+            'Single-Token Syllables': stats['single_token_syllables'],
+            'Single-Token Syllables (%)': round(stats['single_token_syllables'] / HANGUL_SYLLABLE_COUNT * 100, 2),
+            'Prefix Syllables': stats['prefix_syllables'],
+            'Prefix Syllables (%)': round(stats['prefix_syllables'] / HANGUL_SYLLABLE_COUNT * 100, 2),
         }
         
         comparison_data.append(row)
@@ -99,6 +355,118 @@ def create_comparison_dataframe(results: List[Dict[str, Any]]) -> pd.DataFrame:
     return pd.DataFrame(comparison_data)
 
 
+def load_latency_profile(profile_file: str) -> pd.DataFrame:
+    """
+    Load a latency_profiler.py result file into a DataFrame with one row per model.
+    
+    Args:
+        profile_file: Path to the latency profile JSON file
+    
+    Returns:
+        DataFrame with load cost, latency percentiles and batched throughput per model
+    """
+    import pandas as pd
+    
+    with open(profile_file, 'r', encoding='utf-8') as f:
+        profiles = json.load(f)['models']
+    
+    latency_data = []
+    
+    for profile in profiles:
+        row = {
+            'Model': profile['model'],
+            'Load Time (s)': round(profile['load_seconds'], 3),
+            'RSS After Load (MB)': round(profile['rss_after_load_mb'], 1),
+            'p50 Latency (ms)': round(profile['latency']['p50_ms'], 3),
+            'p95 Latency (ms)': round(profile['latency']['p95_ms'], 3),
+            'p99 Latency (ms)': round(profile['latency']['p99_ms'], 3),
+        }
+        for throughput in profile['throughput']:
+            row[f"Batch {throughput['batch_size']} (sentences/s)"] = round(throughput['sentences_per_sec'], 1)
+        
+        latency_data.append(row)
+    
+    return pd.DataFrame(latency_data)
+
+
+# Precomposed syllables are ordered by initial consonant, 588 syllables each;
+# initials are romanized because the default chart fonts have no Hangul glyphs
+SYLLABLES_PER_INITIAL = 588
+INITIAL_CONSONANTS = ['g', 'kk', 'n', 'd', 'tt', 'r', 'm', 'b', 'pp', 's', 'ss', 'ø', 'j', 'jj', 'ch', 'k', 't', 'p', 'h']
+
+# Syllable coverage masks in analysis results and how the reports label them
+SYLLABLE_COVERAGE_KINDS = {'single_token': 'Single Token', 'token_prefix': 'Token Prefix'}
+
+
+def load_syllable_coverage(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Decode the Hangul syllable coverage bitsets of each analysis result.
+    
+    Args:
+        results: List of analysis result dictionaries
+    
+    Returns:
+        Dictionary mapping model names to their 'single_token' and 'token_prefix' masks, where
+        entry i stands for chr(0xAC00 + i)
+    """
+    return {result['model_id'].split('/')[-1]: decode_token_masks(result['syllable_coverage']) for result in results}
+
+
+def compare_syllable_coverage(coverage: Dict[str, Dict[str, np.ndarray]], kind: str = 'single_token') -> pd.DataFrame:
+    """
+    Compare the syllables covered by each pair of models.
+    
+    The masks of all models are stacked into one matrix, so the pairwise intersections are a
+    single matrix product and the syllables only one model covers a column sum.
+    
+    Args:
+        coverage: Syllable coverage masks from load_syllable_coverage
+        kind: Which coverage to compare, 'single_token' or 'token_prefix'
+    
+    Returns:
+        DataFrame with one row per model: its covered syllables, the syllables it shares with
+        each model, and the syllables no other model covers
+    """
+    import pandas as pd
+    
+    models = list(coverage)
+    masks = np.stack([coverage[model][kind] for model in models])
+    covered = masks.astype(np.int32)
+    shared = covered @ covered.T
+    only_this_model = (masks & (covered.sum(axis=0) == 1)).sum(axis=1)
+    
+    shared_df = pd.DataFrame(shared, columns=models)
+    shared_df.insert(0, 'Model', models)
+    shared_df.insert(1, 'Covered', masks.sum(axis=1))
+    shared_df['Only This Model'] = only_this_model
+    return shared_df
+
+
+def create_syllable_coverage_dataframe(coverage: Dict[str, Dict[str, np.ndarray]]) -> pd.DataFrame:
+    """
+    Create a DataFrame with the share of syllables each model covers per initial consonant.
+    
+    Args:
+        coverage: Syllable coverage masks from load_syllable_coverage
+    
+    Returns:
+        DataFrame with a row per model and coverage kind, and the percentage of the
+        syllables starting with each initial consonant that are covered
+    """
+    import pandas as pd
+    
+    coverage_data = []
+    
+    for model, masks in coverage.items():
+        for kind, label in SYLLABLE_COVERAGE_KINDS.items():
+            by_initial = masks[kind].reshape(len(INITIAL_CONSONANTS), SYLLABLES_PER_INITIAL).mean(axis=1) * 100
+            row = {'Model': model, 'Coverage': label}
+            row.update(zip(INITIAL_CONSONANTS, np.round(by_initial, 2).tolist()))
+            coverage_data.append(row)
+    
+    return pd.DataFrame(coverage_data)
+
+
 def create_absolute_count_histogram(df: pd.DataFrame, output_dir: str):
     """
     Create histograms comparing absolute token counts across models.
@@ -107,6 +475,9 @@ def create_absolute_count_histogram(df: pd.DataFrame, output_dir: str):
         df: DataFrame with comparison data
         output_dir: Directory to save the plot
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
     plt.figure(figsize=(15, 10))
     
     # Prepare data for plotting
@@ -149,6 +520,9 @@ def create_percentage_histogram(df: pd.DataFrame, output_dir: str):
         df: DataFrame with comparison data
         output_dir: Directory to save the plot
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
     plt.figure(figsize=(15, 10))
     
     # Prepare data for plotting
@@ -192,6 +566,8 @@ def create_stacked_percentage_chart(df: pd.DataFrame, output_dir: str):
         df: DataFrame with comparison data
         output_dir: Directory to save the plot
     """
+    import matplotlib.pyplot as plt
+    
     plt.figure(figsize=(15, 8))
     
     # Extract required columns
@@ -239,6 +615,8 @@ def create_radar_chart(df: pd.DataFrame, output_dir: str):
         df: DataFrame with comparison data
         output_dir: Directory to save the plot
     """
+    import matplotlib.pyplot as plt
+    
     # Set up variables for the chart
     categories = ['Pure English (%)', 'English Containing (%)', 'Pure Hangul (%)', 
                  'Hangul Containing (%)', 'Special Chars (%)', 'Uncategorized (%)']
@@ -285,23 +663,223 @@ def create_radar_chart(df: pd.DataFrame, output_dir: str):
     print(f"Radar chart saved to: {output_path}")
 
 
-def create_detailed_table(df: pd.DataFrame, output_dir: str):
+def create_syllable_coverage_heatmap(coverage_df: pd.DataFrame, output_dir: str):
+    """
+    Create a heatmap of Hangul syllable coverage per model and initial consonant.
+    
+    Args:
+        coverage_df: DataFrame from create_syllable_coverage_dataframe
+        output_dir: Directory to save the plot
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    num_models = coverage_df['Model'].nunique()
+    fig, axes = plt.subplots(len(SYLLABLE_COVERAGE_KINDS), 1,
+                             figsize=(15, len(SYLLABLE_COVERAGE_KINDS) * (1.5 + 0.6 * num_models)))
+    
+    # One panel per coverage kind, with the same color scale
+    for ax, label in zip(np.atleast_1d(axes), SYLLABLE_COVERAGE_KINDS.values()):
+        panel = coverage_df[coverage_df['Coverage'] == label].set_index('Model')[INITIAL_CONSONANTS]
+        sns.heatmap(panel, ax=ax, vmin=0, vmax=100, cmap='YlGnBu', annot=True, fmt='.0f',
+                    cbar_kws={'label': '% of syllables covered'})
+        ax.set_title(f'Hangul Syllables Covered as {label}', fontsize=14)
+        ax.set_xlabel('Initial consonant (romanized)', fontsize=12)
+        ax.set_ylabel('Model', fontsize=12)
+    
+    plt.tight_layout()
+    
+    # Save plot
+    output_path = os.path.join(output_dir, 'hangul_syllable_coverage_heatmap.png')
+    plt.savefig(output_path, dpi=300)
+    plt.close()
+    
+    print(f"Syllable coverage heatmap saved to: {output_path}")
+
+
+# Comparison columns plotted by the charts
+COUNT_COLUMNS = ['Model', 'Pure English', 'English Containing', 'Pure Hangul', 'Hangul Containing',
+                 'Special Chars', 'Uncategorized']
+PERCENTAGE_COLUMNS = ['Model', 'Pure English (%)', 'English Containing (%)', 'Pure Hangul (%)',
+                      'Hangul Containing (%)', 'Special Chars (%)', 'Uncategorized (%)']
+
+# Charts rendered by render_charts: chart function, the file it writes and the columns it plots
+CHARTS = [
+    (create_absolute_count_histogram, 'absolute_token_count_comparison.png', COUNT_COLUMNS),
+    (create_percentage_histogram, 'percentage_token_distribution_comparison.png', PERCENTAGE_COLUMNS),
+    (create_stacked_percentage_chart, 'stacked_percentage_distribution.png', PERCENTAGE_COLUMNS),
+    (create_radar_chart, 'radar_chart_comparison.png', PERCENTAGE_COLUMNS),
+]
+
+# Charts of the syllable coverage DataFrame from create_syllable_coverage_dataframe
+SYLLABLE_COVERAGE_CHARTS = [
+    (create_syllable_coverage_heatmap, 'hangul_syllable_coverage_heatmap.png', ['Model', 'Coverage'] + INITIAL_CONSONANTS),
+]
+
+# Bump when a chart's appearance changes so stale cached charts are not reused
+CHART_CACHE_VERSION = 1
+
+
+def compute_chart_cache_key(chart_name: str, df: pd.DataFrame, columns: List[str]) -> str:
+    """
+    Compute a content hash of the data a chart plots.
+    
+    Args:
+        chart_name: Name of the chart function
+        df: DataFrame with comparison data
+        columns: Columns of df the chart plots
+    
+    Returns:
+        Hex digest identifying the rendered chart
+    """
+    import pandas as pd
+    
+    digest = hashlib.sha256()
+    digest.update(f"version={CHART_CACHE_VERSION};chart={chart_name};columns={columns}".encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df[columns], index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def init_chart_worker():
+    """Select the headless Agg backend before a chart worker imports pyplot."""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def render_chart_captured(chart, df: pd.DataFrame, output_dir: str,
+                          profile: bool = False) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Render one chart with its console output captured.
+    
+    Used by the process pool so the chart logs can be printed in a stable order.
+    
+    Args:
+        chart: Chart function from CHARTS
+        df: DataFrame with comparison data
+        output_dir: Directory to save the chart
+        profile: Whether to record the chart's stage
+    
+    Returns:
+        Everything the chart function printed, and the stage records (empty unless profile is True)
+    """
+    profiler = StageProfiler(enabled=profile)
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+        with profiler.stage(chart.__name__.replace('create_', 'chart_')):
+            chart(df, output_dir)
+    return buffer.getvalue(), profiler.records
+
+
+def render_charts(df: pd.DataFrame, output_dir: str, cache_dir: str = None, workers: int = 1,
+                  profiler: StageProfiler = None, charts: List[tuple] = None) -> int:
+    """
+    Render the comparison charts, reusing cached charts whose data has not changed.
+    
+    Each chart is cached by a hash of the columns it plots (see compute_chart_cache_key),
+    so a chart is only rendered again when its data changes. With workers > 1 the charts
+    that need rendering are drawn concurrently in worker processes on the Agg backend.
+    
+    Args:
+        df: DataFrame with comparison data
+        output_dir: Directory to save the charts
+        cache_dir: Directory holding cached charts, or None to always render
+        workers: Number of worker processes rendering charts in parallel
+        profiler: Optional StageProfiler recording a stage per rendered chart
+        charts: Charts to render, in the format of CHARTS (default: CHARTS)
+    
+    Returns:
+        Number of charts rendered (the rest were taken from the cache)
+    """
+    profiler = profiler or StageProfiler(enabled=False)
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    pending = []
+    for chart, filename, columns in charts or CHARTS:
+        output_path = os.path.join(output_dir, filename)
+        cache_file = None
+        if cache_dir is not None:
+            cache_key = compute_chart_cache_key(chart.__name__, df, columns)
+            cache_file = os.path.join(cache_dir, f"{cache_key}.png")
+            if os.path.exists(cache_file):
+                shutil.copyfile(cache_file, output_path)
+                print(f"Using cached chart {output_path} ({cache_key[:12]})")
+                continue
+        pending.append((chart, output_path, cache_file))
+    
+    if workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), initializer=init_chart_worker) as executor:
+            futures = [executor.submit(render_chart_captured, chart, df, output_dir, profiler.enabled)
+                       for chart, _, _ in pending]
+            
+            # Collect in submission order so the console output is stable
+            for future in futures:
+                log, records = future.result()
+                print(log, end='')
+                profiler.add_records(records)
+    elif pending:
+        init_chart_worker()
+        for chart, _, _ in pending:
+            with profiler.stage(chart.__name__.replace('create_', 'chart_')):
+                chart(df, output_dir)
+    
+    for _, output_path, cache_file in pending:
+        if cache_file is not None:
+            shutil.copyfile(output_path, cache_file)
+    
+    return len(pending)
+
+
+def create_detailed_table(df: pd.DataFrame, output_dir: str, latency_df: pd.DataFrame = None,
+                          shared_df: pd.DataFrame = None):
     """
     Create a detailed HTML table with all comparison data.
     
     Args:
         df: DataFrame with comparison data
         output_dir: Directory to save the HTML file
+        latency_df: Optional DataFrame from load_latency_profile, shown below the vocabulary table
+        shared_df: Optional DataFrame from compare_syllable_coverage, shown with the syllable coverage heatmap
     """
     # Style the DataFrame for better visualization
     styled_df = df.style.background_gradient(cmap='Blues', subset=[col for col in df.columns if '%' in col]) \
-                       .format({col: '{:,.0f}' for col in df.columns if 'Total' in col or col in ['Pure English', 'English Containing', 'Pure Hangul', 'Hangul Containing', 'Special Chars', 'Uncategorized']}) \
+                       .format({col: '{:,.0f}' for col in df.columns if 'Total' in col or col in ['Pure English', 'English Containing', 'Pure Hangul', 'Hangul Containing', 'Special Chars', 'Uncategorized', 'Single-Token Syllables', 'Prefix Syllables']}) \
                        .format({col: '{:.2f}%' for col in df.columns if '%' in col}) \
                        .set_caption('Detailed Tokenizer Analysis Comparison')
     
     # Convert to HTML
     html_table = styled_df.to_html()
     
+    latency_section = ""
+    if latency_df is not None:
+        latency_table = latency_df.style.hide(axis='index') \
+                                  .format({col: '{:,.1f}' for col in latency_df.columns if 'sentences/s' in col}) \
+                                  .format({col: '{:.3f}' for col in latency_df.columns if 'ms' in col or 'Time' in col}) \
+                                  .format({col: '{:,.1f}' for col in latency_df.columns if 'MB' in col}) \
+                                  .set_caption('Encode Latency and Memory') \
+                                  .to_html()
+        latency_section = f"""
+        <div style="margin-top: 20px;">
+            <p>Cold load time (including imports) and resident memory after loading each tokenizer,
+            single-sentence encode latency percentiles, and batched encode throughput.</p>
+            {latency_table}
+        </div>"""
+    
+    coverage_section = ""
+    if shared_df is not None:
+        shared_table = shared_df.style.hide(axis='index') \
+                                .format({col: '{:,.0f}' for col in shared_df.columns if col != 'Model'}) \
+                                .set_caption('Hangul Syllables Covered as Single Tokens, Shared Between Models') \
+                                .to_html()
+        coverage_section = f"""
+        <div style="margin-top: 20px;">
+            <h3>Hangul Syllable Coverage:</h3>
+            <p>Share of the {HANGUL_SYLLABLE_COUNT:,} precomposed Hangul syllables (U+AC00&ndash;U+D7A3) each tokenizer
+            has as a single token or as the first character of a token, by initial consonant.</p>
+            <img src="hangul_syllable_coverage_heatmap.png" alt="Hangul syllable coverage heatmap" style="max-width: 100%;">
+            {shared_table}
+        </div>"""
+    
     # Add some CSS for better styling
     css = """
     <style>
@@ -350,8 +928,9 @@ def create_detailed_table(df: pd.DataFrame, output_dir: str):
                 <li><strong>Hangul Containing:</strong> Tokens containing any Korean Hangul characters</li>
                 <li><strong>Special Chars:</strong> Tokens containing only special characters (no alphanumeric characters)</li>
                 <li><strong>Uncategorized:</strong> Tokens that don't fit into any of the above categories</li>
+                <li><strong>Single-Token / Prefix Syllables:</strong> Precomposed Hangul syllables that are a whole token, or the first character of a token</li>
             </ul>
-        </div>
+        </div>{coverage_section}{latency_section}
     </body>
     </html>
     """
@@ -369,13 +948,25 @@ def create_detailed_table(df: pd.DataFrame, output_dir: str):
     print(f"CSV data saved to: {csv_path}")
 
 
-def generate_summary_report(df: pd.DataFrame, output_dir: str):
+def markdown_table(df: pd.DataFrame) -> str:
+    """Format a DataFrame as a markdown table, with the first column left-aligned and the rest right-aligned."""
+    header = '| ' + ' | '.join(df.columns) + ' |'
+    separator = '|' + '|'.join(['---'] + ['---:'] * (len(df.columns) - 1)) + '|'
+    rows = ['| ' + ' | '.join(str(value) for value in row) + ' |' for row in df.itertuples(index=False)]
+    return '\n'.join([header, separator] + rows) + '\n'
+
+
+def generate_summary_report(df: pd.DataFrame, output_dir: str, latency_df: pd.DataFrame = None,
+                            timing_df: pd.DataFrame = None, shared_df: pd.DataFrame = None):
     """
     Generate a summary report in markdown format.
     
     Args:
         df: DataFrame with comparison data
         output_dir: Directory to save the report
+        latency_df: Optional DataFrame from load_latency_profile, added as an Encode Latency section
+        timing_df: Optional DataFrame of StageProfiler.summary_rows(), added as a Pipeline Timing section
+        shared_df: Optional DataFrame from compare_syllable_coverage, added as a Hangul Syllable Coverage section
     """
     # Calculate averages
     avg_row = {
@@ -435,6 +1026,7 @@ Various visualizations were created to help understand the differences between t
 2. **Percentage Distribution Chart**: Shows the relative distribution as percentages
 3. **Stacked Percentage Chart**: Shows how each tokenizer's vocabulary is composed
 4. **Radar Chart**: Provides a multi-dimensional view of category distributions
+5. **Hangul Syllable Coverage Heatmap**: Shows which share of the Hangul syllables each tokenizer has as a token, by initial consonant
 
 ## Detailed Results
 
@@ -453,6 +1045,43 @@ Based on the analysis:
 
 """
     
+    if latency_df is not None:
+        fastest = latency_df.loc[latency_df['p50 Latency (ms)'].idxmin()]
+        lightest = latency_df.loc[latency_df['RSS After Load (MB)'].idxmin()]
+        report += f"""## Encode Latency
+
+- {fastest['Model']} has the lowest median single-sentence latency ({fastest['p50 Latency (ms)']:.3f} ms)
+- {lightest['Model']} has the smallest resident memory after load ({lightest['RSS After Load (MB)']:,.1f} MB)
+
+""" + markdown_table(latency_df)
+    
+    if shared_df is not None:
+        widest = df.loc[df['Single-Token Syllables'].idxmax()]
+        report += f"""
+## Hangul Syllable Coverage
+
+Precomposed Hangul syllables (of {HANGUL_SYLLABLE_COUNT:,}) that each tokenizer has as a single token, and how
+many of them each pair of tokenizers shares. See `hangul_syllable_coverage_heatmap.png` for coverage by initial consonant.
+
+- {widest['Model']} covers the most syllables as single tokens ({widest['Single-Token Syllables']:,}, {widest['Single-Token Syllables (%)']:.2f}%)
+- {shared_df['Only This Model'].sum():,} syllables are single tokens in only one tokenizer
+
+""" + markdown_table(shared_df)
+    
+    if timing_df is not None and len(timing_df):
+        top_level = timing_df[~timing_df['Stage'].str.contains(' / ')]
+        slowest = top_level.loc[top_level['Wall (s)'].idxmax()]
+        report += f"""
+## Pipeline Timing
+
+Stages completed before this report was written, from `--profile`. Nested stages are listed as
+`parent / stage`; CPU time includes worker processes, and peak RSS is per stage and process.
+
+- Slowest stage: {slowest['Stage']} ({slowest['Wall (s)']:.2f} s wall, {slowest['CPU (s)']:.2f} s CPU)
+- Total wall time of top-level stages: {top_level['Wall (s)'].sum():.2f} s
+
+""" + markdown_table(timing_df)
+    
     # Save to file
     output_path = os.path.join(output_dir, 'tokenizer_analysis_summary.md')
     with open(output_path, 'w', encoding='utf-8') as f:
@@ -471,9 +1100,39 @@ def main():
                         help="List of model IDs to analyze and compare")
     parser.add_argument('--output_dir', type=str, default="results/tokenizer_comparison_results",
                         help="Directory to save results and visualizations")
+    parser.add_argument('--min_token_id', type=int, default=102,
+                        help="Minimum token ID to analyze (default: 102)")
+    parser.add_argument('--cache_dir', type=str, default=None,
+                        help="Directory for cached per-model analysis results (default: <output_dir>/analysis_cache)")
+    parser.add_argument('--no_cache', action='store_true',
+                        help="Re-run every analysis instead of using cached results")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of worker processes for analyzing models in parallel (default: 1)")
+    parser.add_argument('--shard_workers', type=int, default=1,
+                        help="Number of worker processes that split each model's vocabulary into shards (default: 1)")
+    parser.add_argument('--lightweight_tokenizer', action='store_true',
+                        help="Load tokenizers straight from their local tokenizer.json or SentencePiece model "
+                             "instead of AutoTokenizer")
+    parser.add_argument('--token_tables', action='store_true',
+                        help="Also write a Parquet table per model with one row per token ID to "
+                             "<output_dir>/token_tables (requires pyarrow)")
+    parser.add_argument('--latency_profile', type=str, default=None,
+                        help="Path to a latency_profiler.py result file to include in the HTML and markdown reports")
+    parser.add_argument('--chart_workers', type=int, default=min(len(CHARTS), os.cpu_count() or 1),
+                        help="Number of worker processes rendering charts in parallel "
+                             f"(default: one per chart, up to the number of CPUs)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Record wall time, CPU time, peak memory and throughput of each stage and model, "
+                             "write them to <output_dir>/profile_trace.json and add a timing section to the summary report")
     
     args = parser.parse_args()
     
+    profiler = StageProfiler(enabled=args.profile)
+
+    # Fail before the analysis if the token table can't be written
+    if args.token_tables and importlib.util.find_spec('pyarrow') is None:
+        parser.error("--token_tables requires pyarrow (pip install pyarrow)")
+    
     # Create output directory
     os.makedirs(args.output_dir, exist_ok=True)
     
@@ -481,10 +1140,16 @@ def main():
     print(f"Starting analysis of {len(models)} tokenizers...")
     
     # Run analysis for all models
-    result_files = run_analysis_for_models(models, args.output_dir)
+    with profiler.stage('analysis', items=len(models)):
+        result_files = run_analysis_for_models(models, args.output_dir, args.min_token_id,
+                                               cache_dir=args.cache_dir, use_cache=not args.no_cache,
+                                               workers=args.workers, shard_workers=args.shard_workers,
+                                               lightweight=args.lightweight_tokenizer,
+                                               token_tables=args.token_tables, profiler=profiler)
     
     # Load results
-    results = load_analysis_results(result_files)
+    with profiler.stage('load_results', items=len(result_files)):
+        results = load_analysis_results(result_files)
     
     # Create comparison DataFrame
     comparison_df = create_comparison_dataframe(results)
@@ -493,20 +1158,38 @@ def main():
     print("\n=== Tokenizer Comparison Summary ===")
     print(comparison_df.to_string())
     
-    # Create visualizations
+    # Create visualizations, reusing charts whose data has not changed
     print("\nGenerating comparison visualizations...")
-    create_absolute_count_histogram(comparison_df, args.output_dir)
-    create_percentage_histogram(comparison_df, args.output_dir)
-    create_stacked_percentage_chart(comparison_df, args.output_dir)
-    create_radar_chart(comparison_df, args.output_dir)
+    chart_cache_dir = None
+    if not args.no_cache:
+        chart_cache_dir = os.path.join(args.cache_dir or os.path.join(args.output_dir, "analysis_cache"), "charts")
+    with profiler.stage('syllable_coverage', items=len(results)):
+        syllable_coverage = load_syllable_coverage(results)
+        coverage_df = create_syllable_coverage_dataframe(syllable_coverage)
+        shared_df = compare_syllable_coverage(syllable_coverage)
+    with profiler.stage('charts', items=len(CHARTS) + len(SYLLABLE_COVERAGE_CHARTS)):
+        render_charts(comparison_df, args.output_dir, chart_cache_dir, args.chart_workers, profiler)
+        render_charts(coverage_df, args.output_dir, chart_cache_dir, profiler=profiler, charts=SYLLABLE_COVERAGE_CHARTS)
+    
+    # Load encode latency results, if profiled
+    latency_df = load_latency_profile(args.latency_profile) if args.latency_profile else None
     
     # Create detailed table
     print("\nGenerating detailed comparison table...")
-    create_detailed_table(comparison_df, args.output_dir)
+    with profiler.stage('detailed_table', items=len(comparison_df)):
+        create_detailed_table(comparison_df, args.output_dir, latency_df, shared_df)
     
     # Generate summary report
     print("\nGenerating summary report...")
-    generate_summary_report(comparison_df, args.output_dir)
+    timing_df = None
+    if args.profile:
+        import pandas as pd
+        timing_df = pd.DataFrame(profiler.summary_rows())
+    generate_summary_report(comparison_df, args.output_dir, latency_df, timing_df, shared_df)
+    
+    if args.profile:
+        profiler.print_summary()
+        profiler.save_trace(os.path.join(args.output_dir, 'profile_trace.json'), 'run_analyzer', vars(args))
     
     print(f"\nAnalysis complete! All results saved to: {os.path.abspath(args.output_dir)}")
     print(f"\nTo view the full comparison, open: {os.path.join(os.path.abspath(args.output_dir), 'detailed_comparison_table.html')}")
@@ -0,0 +1,237 @@
+import os
+import re
+import json
+import time
+import resource
+import contextlib
+from datetime import datetime
+from typing import List, Dict, Any, Iterator
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the resident memory high-water mark of this process.
+
+    Uses /proc/self/clear_refs, available on Linux 4.0 and later.
+
+    Returns:
+        True if the high-water mark was reset, False if peaks can only be read for the whole process
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    """Return the resident memory high-water mark of this process in MB."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            match = re.search(r'^VmHWM:\s+(\d+) kB', f.read(), re.MULTILINE)
+        if match:
+            return int(match.group(1)) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024) if os.uname().sysname == 'Darwin' else max_rss / 1024
+
+
+def cpu_seconds() -> float:
+    """Return the CPU time of this process plus that of its finished child processes."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class StageProfiler:
+    """
+    Record wall time, CPU time, peak memory and item throughput of pipeline stages.
+
+    Each stage is timed with the stage() context manager and kept as one record. Stages may be
+    nested; a nested stage's record names its parent, and the parent's peak memory includes
+    the nested stage. With accumulate=True, repeated stages with the same name and model are
+    summed into one record, e.g. one record per model for a stage run once per batch.
+
+    CPU time includes worker processes that finished within the stage. Peak memory is the
+    resident set high-water mark of this process during the stage where the OS allows resetting
+    it (Linux), otherwise the peak of the whole process so far; 'peak_rss_scope' says which.
+    Work done in other processes can be added with add_records().
+
+    A disabled profiler runs the stages without measuring them, so pipelines can always
+    call stage().
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.records: List[Dict[str, Any]] = []
+        self.origin = time.perf_counter()
+        self.peak_rss_scope = 'stage' if enabled and reset_peak_rss() else 'process'
+        self._open_stages: List[Dict[str, Any]] = []
+        self._accumulated: Dict[tuple, Dict[str, Any]] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str, model: str = None, items: int = None,
+              accumulate: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Time one stage of the pipeline.
+
+        Args:
+            name: Stage name
+            model: Model the stage works on, or None for stages covering all models
+            items: Number of items processed, for throughput; may also be set on the yielded record
+            accumulate: Sum repeated stages with the same name and model into one record
+
+        Yields:
+            The stage's record; set record['items'] once the item count is known
+        """
+        record = {'stage': name, 'model': model, 'items': items}
+        if not self.enabled:
+            yield record
+            return
+
+        parent = self._open_stages[-1] if self._open_stages else None
+        frame = {'record': record, 'child_peak_mb': 0.0}
+        self._open_stages.append(frame)
+        if self.peak_rss_scope == 'stage':
+            reset_peak_rss()
+        start_cpu = cpu_seconds()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - start
+            cpu = cpu_seconds() - start_cpu
+            peak = max(peak_rss_mb(), frame['child_peak_mb'])
+            self._open_stages.pop()
+            if parent is not None:
+                parent['child_peak_mb'] = max(parent['child_peak_mb'], peak)
+            record.update({
+                'parent': parent['record']['stage'] if parent is not None else None,
+                'pid': os.getpid(),
+                'start_s': start - self.origin,
+                'wall_s': wall,
+                'cpu_s': cpu,
+                'peak_rss_mb': peak,
+                'calls': 1,
+            })
+            self._finish(record, accumulate)
+
+    def _finish(self, record: Dict[str, Any], accumulate: bool):
+        key = (record['stage'], record['model'], record['parent'])
+        previous = self._accumulated.get(key) if accumulate else None
+        if previous is None:
+            if accumulate:
+                self._accumulated[key] = record
+            self.records.append(record)
+            return
+
+        previous['wall_s'] += record['wall_s']
+        previous['cpu_s'] += record['cpu_s']
+        previous['peak_rss_mb'] = max(previous['peak_rss_mb'], record['peak_rss_mb'])
+        previous['calls'] += 1
+        if record['items'] is not None:
+            previous['items'] = (previous['items'] or 0) + record['items']
+
+    def add_stage(self, name: str, model: str = None, wall_s: float = 0.0, cpu_s: float = None,
+                  items: int = None):
+        """
+        Add a stage timed by the caller, e.g. work done concurrently on a worker thread.
+
+        Stages overlapping in threads can't be told apart in the process's memory high-water
+        mark, so the record has no peak memory. It becomes a child of the currently open stage.
+
+        Args:
+            name: Stage name
+            model: Model the stage worked on
+            wall_s: Wall-clock seconds the stage took
+            cpu_s: CPU seconds the stage used, e.g. from time.thread_time()
+            items: Number of items processed, for throughput
+        """
+        if not self.enabled:
+            return
+        parent = self._open_stages[-1] if self._open_stages else None
+        self.records.append({
+            'stage': name,
+            'model': model,
+            'items': items,
+            'parent': parent['record']['stage'] if parent is not None else None,
+            'pid': os.getpid(),
+            'start_s': time.perf_counter() - wall_s - self.origin,
+            'wall_s': wall_s,
+            'cpu_s': cpu_s,
+            'peak_rss_mb': None,
+            'calls': 1,
+        })
+
+    def add_records(self, records: List[Dict[str, Any]]):
+        """
+        Add stage records measured by a profiler in another process, e.g. a pool worker.
+
+        Top-level records become children of the currently open stage. Their start_s and peak
+        memory stay those of the process that measured them (see their pid).
+        """
+        if not self.enabled:
+            return
+        parent = self._open_stages[-1] if self._open_stages else None
+        for record in records:
+            if record['parent'] is None and parent is not None:
+                record = dict(record, parent=parent['record']['stage'])
+            self.records.append(record)
+
+    def summary_rows(self) -> List[Dict[str, Any]]:
+        """
+        Return one row per stage record with throughput, in the order the stages finished.
+
+        Returns:
+            List of dictionaries with Stage, Model, Wall (s), CPU (s), Peak RSS (MB), Items and Items/s
+        """
+        rows = []
+        for record in self.records:
+            items = record['items']
+            rows.append({
+                'Stage': record['stage'] if record['parent'] is None else f"{record['parent']} / {record['stage']}",
+                'Model': record['model'] or '-',
+                'Wall (s)': round(record['wall_s'], 3),
+                'CPU (s)': round(record['cpu_s'], 3) if record['cpu_s'] is not None else '-',
+                'Peak RSS (MB)': round(record['peak_rss_mb'], 1) if record['peak_rss_mb'] is not None else '-',
+                'Items': items if items is not None else '-',
+                'Items/s': round(items / record['wall_s'], 1) if items and record['wall_s'] else '-',
+            })
+        return rows
+
+    def print_summary(self):
+        """Print the stage records as a table."""
+        if not self.enabled:
+            return
+        print("\n=== Stage Profile ===")
+        print(f"{'Stage':<40} {'Model':<32} {'Wall':>9} {'CPU':>9} {'Peak RSS':>11} {'Items/s':>12}")
+        for row in self.summary_rows():
+            throughput = f"{row['Items/s']:,.0f}" if row['Items/s'] != '-' else '-'
+            cpu = f"{row['CPU (s)']:.2f} s" if row['CPU (s)'] != '-' else '-'
+            peak = f"{row['Peak RSS (MB)']:.1f} MB" if row['Peak RSS (MB)'] != '-' else '-'
+            print(f"{row['Stage']:<40} {row['Model']:<32} {row['Wall (s)']:>7.2f} s {cpu:>9} {peak:>11} {throughput:>12}")
+
+    def save_trace(self, output_file: str, command: str, settings: Dict[str, Any] = None):
+        """
+        Save the stage records as a JSON trace file.
+
+        Args:
+            output_file: Path of the trace file
+            command: Name of the pipeline that was profiled
+            settings: Optional command line settings to store with the trace
+        """
+        output_dir = os.path.dirname(output_file)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'command': command,
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'settings': settings or {},
+                'total_wall_s': time.perf_counter() - self.origin,
+                'peak_rss_scope': self.peak_rss_scope,
+                'stages': self.records,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"Profile trace saved to: {output_file}")
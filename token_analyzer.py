@@ -1,10 +1,20 @@
-import transformers
+import re
 import json
 import argparse
 import os
 import unicodedata
+import importlib.util
+import base64
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import Dict, List, Any, Tuple
+import numpy as np
 from tqdm import tqdm
+from stage_profiler import StageProfiler
+
+# Number of token IDs handed to the tokenizer backend per decode call
+DECODE_BATCH_SIZE = 32768
 
 def is_hangul_char(char):
     """Check if a character is Hangul (Korean)"""
@@ -28,175 +38,521 @@ def is_special_char_token(token: str) -> bool:
     """Check if the token consists only of special characters."""
     return all(not (c.isalnum() or c.isspace()) for c in token)
 
-def analyze_token_categories(model_id: str, min_token_id: int = 102) -> Dict[str, Any]:
-    """Analyze tokens in each category for the tokenizer's entire vocabulary."""
-
+# Characters allowed alongside English/Hangul letters in a "pure" token
+PURE_TOKEN_PUNCTUATION = ".,;:!?-'\"()"
+
+# Per-codepoint class flags used by the lookup-table classifier
+CHAR_ENGLISH = 1
+CHAR_HANGUL = 2
+CHAR_NOT_PURE_ENGLISH = 4
+CHAR_NOT_PURE_HANGUL = 8
+CHAR_ALNUM_OR_SPACE = 16
+CHAR_SPACE = 32
+
+# Per-token category flags returned by classify_tokens
+PURE_ENGLISH = 1
+ENGLISH_CONTAINING = 2
+PURE_HANGUL = 4
+HANGUL_CONTAINING = 8
+SPECIAL_CHAR = 16
+
+# Precomposed Hangul syllables (U+AC00-U+D7A3) tracked by the syllable coverage bitsets
+HANGUL_SYLLABLE_FIRST = 0xAC00
+HANGUL_SYLLABLE_COUNT = 11172
+
+# Category masks in analysis results, with the token flag each one is built from
+CATEGORY_FLAGS = {
+    'pure_english': PURE_ENGLISH,
+    'english_containing': ENGLISH_CONTAINING,
+    'pure_hangul': PURE_HANGUL,
+    'hangul_containing': HANGUL_CONTAINING,
+    'special_char': SPECIAL_CHAR,
+}
+
+# Token-bias ID lists written to the working directory; each analyzed model overwrites them
+TOKEN_ID_FILES = ['categorized_token_ids.txt', 'categorized_tokens.json', 'uncategorized_token_ids.txt']
+
+def unicode_class_mask(pattern: str, text: str) -> np.ndarray:
+    """Mark the characters of text matched by a single-character regex class, scanning runs of matches."""
+    spans = np.array([match.span() for match in re.finditer(f"{pattern}+", text)], dtype=np.int64).reshape(-1, 2)
+    # Runs are maximal, so no run starts where the previous one ends
+    delta = np.zeros(len(text) + 1, dtype=np.int8)
+    delta[spans[:, 0]] = 1
+    delta[spans[:, 1]] = -1
+    return np.cumsum(delta[:-1], dtype=np.int8) > 0
+
+
+@lru_cache(maxsize=None)
+def build_codepoint_table() -> np.ndarray:
+    """
+    Build a table mapping every Unicode codepoint to its CHAR_* class flags.
+
+    English letters, Hangul blocks and the pure-token punctuation are set by slicing. The
+    Unicode properties come from regex classes over one string of every codepoint: for str
+    patterns \\w is str.isalnum() plus '_', \\s is str.isspace() and \\d is str.isdecimal().
+    Only non-decimal digits (superscripts, circled digits, ...) need a per-character check.
+    """
+    num_codepoints = 0x110000
+    codes = np.arange(num_codepoints, dtype='<u4')
+    text = codes.tobytes().decode('utf-32-le', 'surrogatepass')
+
+    english = np.zeros(num_codepoints, dtype=bool)
+    english[ord('A'):ord('Z') + 1] = True
+    english[ord('a'):ord('z') + 1] = True
+
+    hangul = np.zeros(num_codepoints, dtype=bool)
+    for first, last in [(0xAC00, 0xD7A3), (0x1100, 0x11FF), (0xA960, 0xA97F), (0xD7B0, 0xD7FF)]:
+        hangul[first:last + 1] = True
+
+    alnum = unicode_class_mask(r'\w', text)
+    alnum[ord('_')] = False
+    space = unicode_class_mask(r'\s', text)
+    digit = unicode_class_mask(r'\d', text)
+    for code in np.flatnonzero(alnum & ~digit).tolist():
+        if chr(code).isdigit():
+            digit[code] = True
+
+    neutral = space | digit
+    neutral[[ord(c) for c in PURE_TOKEN_PUNCTUATION]] = True
+    alnum_or_space = alnum | space
+
+    table = np.zeros(num_codepoints, dtype=np.uint8)
+    table[english] |= CHAR_ENGLISH
+    table[hangul] |= CHAR_HANGUL
+    table[~(english | neutral)] |= CHAR_NOT_PURE_ENGLISH
+    table[~(hangul | neutral)] |= CHAR_NOT_PURE_HANGUL
+    table[alnum_or_space] |= CHAR_ALNUM_OR_SPACE
+    table[space] |= CHAR_SPACE
+    return table
+
+def classify_tokens(token_strings: List[str]) -> np.ndarray:
+    """
+    Classify token strings into category flags in a single vectorized pass.
+
+    All strings are concatenated into one UTF-32 buffer, each codepoint is looked up in
+    the class table, and the flags are OR-reduced per token. Returns one uint8 of
+    PURE_ENGLISH | ENGLISH_CONTAINING | PURE_HANGUL | HANGUL_CONTAINING | SPECIAL_CHAR
+    bits per token, matching the per-character rules of is_english_char, is_hangul_char
+    and is_special_char_token.
+    """
+    lengths = np.fromiter((len(s) for s in token_strings), dtype=np.int64, count=len(token_strings))
+    char_flags = np.zeros(len(token_strings), dtype=np.uint8)
+
+    non_empty = lengths > 0
+    if non_empty.any():
+        buffer = "".join(token_strings).encode('utf-32-le', 'surrogatepass')
+        codepoints = np.frombuffer(buffer, dtype='<u4')
+        starts = np.cumsum(lengths) - lengths
+        char_flags[non_empty] = np.bitwise_or.reduceat(build_codepoint_table()[codepoints], starts[non_empty])
+
+    english = (char_flags & CHAR_ENGLISH) != 0
+    hangul = (char_flags & CHAR_HANGUL) != 0
+
+    flags = np.zeros(len(token_strings), dtype=np.uint8)
+    flags[english] |= ENGLISH_CONTAINING
+    flags[english & ((char_flags & CHAR_NOT_PURE_ENGLISH) == 0)] |= PURE_ENGLISH
+    flags[hangul] |= HANGUL_CONTAINING
+    flags[hangul & ((char_flags & CHAR_NOT_PURE_HANGUL) == 0)] |= PURE_HANGUL
+    flags[(char_flags & CHAR_ALNUM_OR_SPACE) == 0] |= SPECIAL_CHAR
+    return flags
+
+def decode_token_ids_one_by_one(tokenizer, token_ids: List[int]) -> Dict[int, str]:
+    """Decode token IDs individually with tokenizer.decode (works for every tokenizer)."""
+    decoded = {}
+    for token_id in token_ids:
+        try:
+            decoded[token_id] = tokenizer.decode([token_id])
+        except Exception as e:
+            print(f"Error decoding token ID {token_id}: {str(e)}")
+    return decoded
+
+def decode_token_ids(tokenizer, token_ids: List[int], batch_size: int = DECODE_BATCH_SIZE) -> Dict[int, str]:
+    """Decode each token ID to its own string, in large batches when the tokenizer is fast."""
+    token_ids = list(token_ids)
+    if not getattr(tokenizer, 'is_fast', False):
+        return decode_token_ids_one_by_one(tokenizer, token_ids)
+
+    backend = tokenizer.backend_tokenizer
+    decoded = {}
+    for start in range(0, len(token_ids), batch_size):
+        batch_ids = token_ids[start:start + batch_size]
+        sequences = [[token_id] for token_id in batch_ids]
+        try:
+            if getattr(tokenizer, 'clean_up_tokenization_spaces', False):
+                # decode() post-processes the backend output here, so keep its exact behaviour
+                token_strings = tokenizer.batch_decode(sequences)
+            else:
+                token_strings = backend.decode_batch(sequences, skip_special_tokens=False)
+        except Exception as e:
+            print(f"Batch decode failed for token IDs {batch_ids[0]}-{batch_ids[-1]}, decoding one by one: {str(e)}")
+            decoded.update(decode_token_ids_one_by_one(tokenizer, batch_ids))
+            continue
+        decoded.update(zip(batch_ids, token_strings))
+    return decoded
+
+# Tokenizer used by shard worker processes, set by init_shard_worker
+_shard_tokenizer = None
+
+def init_shard_worker(tokenizer):
+    """Give a shard worker process its copy of the tokenizer."""
+    global _shard_tokenizer
+    _shard_tokenizer = tokenizer
+
+def decode_and_classify(tokenizer, token_ids: List[int], profiler: StageProfiler = None,
+                        model_name: str = None) -> Tuple[List[str], np.ndarray]:
+    """
+    Decode a run of token IDs and classify the resulting strings.
+
+    Returns the strings aligned with token_ids (None where decoding failed) and their
+    classify_tokens flags (0 where decoding failed). With a profiler, the time spent
+    decoding and classifying is added to its 'decode' and 'classify' stages for model_name.
+    """
+    profiler = profiler or StageProfiler(enabled=False)
+    with profiler.stage('decode', model_name, len(token_ids), accumulate=True):
+        decoded = decode_token_ids(tokenizer, token_ids)
+        token_strings = [decoded.get(token_id) for token_id in token_ids]
+    with profiler.stage('classify', model_name, len(token_ids), accumulate=True):
+        is_decoded = np.fromiter((token is not None for token in token_strings), dtype=bool,
+                                 count=len(token_strings))
+        token_flags = np.zeros(len(token_strings), dtype=np.uint8)
+        token_flags[is_decoded] = classify_tokens([token for token in token_strings if token is not None])
+    return token_strings, token_flags
+
+def decode_and_classify_shard(token_ids: List[int]) -> Tuple[List[str], np.ndarray]:
+    """Worker entry point for decode_and_classify, using the tokenizer from init_shard_worker."""
+    return decode_and_classify(_shard_tokenizer, token_ids)
+
+def load_tokenizer(model_id: str, lightweight: bool = False):
+    """Load a tokenizer with AutoTokenizer, or with the lightweight tokenizer.json/SentencePiece loader."""
+    if lightweight:
+        from tokenizer_loader import load_lightweight_tokenizer
+        return load_lightweight_tokenizer(model_id)
+
+    # transformers is slow to import, so only load it once a tokenizer is needed
+    import transformers
+    return transformers.AutoTokenizer.from_pretrained(model_id)
+
+def build_decoded_vocabulary(model_id: str, min_token_id: int = 102, workers: int = 1,
+                             lightweight: bool = False, profiler: StageProfiler = None,
+                             tokenizer=None) -> Dict[str, Any]:
+    """
+    Load the tokenizer once, then decode and classify every token ID in the analyzed range.
+
+    The returned store is shared by the rest of the analysis pipeline so no token is decoded
+    twice and the tokenizer is never reloaded. It is one array-backed table of token records:
+    'token_ids' is a sorted int32 array of the analyzed IDs, 'token_strings' the list of their
+    decoded strings (None where decoding failed), each distinct string held once, and
+    'token_flags' a uint8 array of their classify_tokens category flags.
+
+    With workers > 1 the sorted ID range is split into shards that are decoded and classified
+    in a process pool. Shards are merged in ID order, so the store is identical to a serial run.
+    With lightweight=True the tokenizer is built straight from its local files instead of
+    through AutoTokenizer. A tokenizer the caller already loaded can be passed instead.
+
+    A profiler records the 'load_tokenizer', 'decode' and 'classify' stages; with workers > 1
+    shards are decoded and classified together in the pool, recorded as 'decode_classify'.
+    """
+    profiler = profiler or StageProfiler(enabled=False)
+    model_name = model_id.split('/')[-1] if '/' in model_id else model_id
     print(f"Analyzing tokens for model: {model_id}")
     # Load tokenizer
-    tokenizer = transformers.AutoTokenizer.from_pretrained(model_id)
-    vocab = tokenizer.get_vocab()
+    with profiler.stage('load_tokenizer', model_name):
+        if tokenizer is None:
+            tokenizer = load_tokenizer(model_id, lightweight)
+        vocab = tokenizer.get_vocab()
 
     max_token_id = len(vocab.values())
 
-    # Token_id and string dictionaries for each category
-    pure_english_tokens = {}
-    english_containing_tokens = {}
-    pure_hangul_tokens = {}
-    hangul_containing_tokens = {}
-    special_char_tokens = {}
-    uncategorized_tokens = {}
-
     # Include only token IDs from min_token_id to max_token_id-1
-    all_token_ids = {token_id for token_id in vocab.values() if min_token_id < token_id < max_token_id}
-    all_tokens = {token_id: token for token, token_id in vocab.items() if min_token_id < token_id < max_token_id}
+    token_ids = np.fromiter(vocab.values(), dtype=np.int64, count=len(vocab))
+    del vocab
+    token_ids = np.unique(token_ids[(token_ids > min_token_id) & (token_ids < max_token_id)]).astype(np.int32)
+
+    print(f"Analyzing {len(token_ids)} tokens (ID > {min_token_id} and ID < {max_token_id})...")
+    sorted_ids = token_ids.tolist()
+    token_strings = []
+    flag_shards = []
+
+    # Equal strings decoded for different IDs (or in different workers) share one object
+    interned = {}
+
+    def add_shard(shard_strings, shard_flags):
+        token_strings.extend(interned.setdefault(token, token) if token is not None else None
+                             for token in shard_strings)
+        flag_shards.append(shard_flags)
+
+    if workers > 1:
+        # Several shards per worker keeps the pool busy when shards decode at different speeds
+        shard_size = max(1, -(-len(sorted_ids) // (workers * 4)))
+    else:
+        shard_size = DECODE_BATCH_SIZE
+    shards = [sorted_ids[start:start + shard_size] for start in range(0, len(sorted_ids), shard_size)]
+
+    with tqdm(total=len(sorted_ids)) as progress:
+        if workers > 1 and len(shards) > 1:
+            # Build the lookup table before forking so every worker inherits it
+            build_codepoint_table()
+            with profiler.stage('decode_classify', model_name, len(sorted_ids)), \
+                    ProcessPoolExecutor(max_workers=workers, initializer=init_shard_worker,
+                                        initargs=(tokenizer,)) as executor:
+                for shard, (shard_strings, shard_flags) in zip(shards, executor.map(decode_and_classify_shard, shards)):
+                    add_shard(shard_strings, shard_flags)
+                    progress.update(len(shard))
+        else:
+            for shard in shards:
+                add_shard(*decode_and_classify(tokenizer, shard, profiler, model_name))
+                progress.update(len(shard))
 
-    print(f"Analyzing {len(all_token_ids)} tokens (ID > {min_token_id} and ID < {max_token_id})...")
-    for token, token_id in tqdm(vocab.items()):
-        # Skip tokens outside our range
-        if token_id <= min_token_id or token_id >= max_token_id:
-            continue
+    return {
+        'model_id': model_id,
+        'min_token_id': min_token_id,
+        'max_token_id': max_token_id,
+        'token_ids': token_ids,
+        'token_strings': token_strings,
+        'token_flags': np.concatenate(flag_shards) if flag_shards else np.zeros(0, dtype=np.uint8)
+    }
 
-        try:
-            # Get string representation of the token
-            token_string = tokenizer.decode([token_id])
-            
-            # English analysis
-            english_chars = sum(1 for c in token_string if is_english_char(c))
-            if english_chars > 0:
-                english_containing_tokens[token_id] = token_string
-                if all(is_english_char(c) or c.isspace() or c.isdigit() or c in ".,;:!?-'\"()" for c in token_string):
-                    pure_english_tokens[token_id] = token_string
-            
-            # Hangul analysis
-            hangul_chars = sum(1 for c in token_string if is_hangul_char(c))
-            if hangul_chars > 0:
-                hangul_containing_tokens[token_id] = token_string
-                if all(is_hangul_char(c) or c.isspace() or c.isdigit() or c in ".,;:!?-'\"()" for c in token_string):
-                    pure_hangul_tokens[token_id] = token_string
-            
-            # Special character analysis
-            if is_special_char_token(token_string):
-                special_char_tokens[token_id] = token_string
-                
-        except Exception as e:
-            print(f"Error analyzing token {token} (ID: {token_id}): {str(e)}")
+def build_category_masks(decoded_vocab: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Build boolean masks indexed by token ID for each category of a decoded vocabulary.
+
+    Masks have max_token_id entries. 'analyzed' marks the token IDs in the analyzed range,
+    one mask per CATEGORY_FLAGS entry marks its members, and 'uncategorized' marks analyzed
+    IDs that are in no category (including IDs that could not be decoded).
+    """
+    size = decoded_vocab['max_token_id']
+    token_ids = decoded_vocab['token_ids']
+
+    analyzed = np.zeros(size, dtype=bool)
+    analyzed[token_ids] = True
+
+    flags = np.zeros(size, dtype=np.uint8)
+    flags[token_ids] = decoded_vocab['token_flags']
+
+    masks = {'analyzed': analyzed}
+    for name, flag in CATEGORY_FLAGS.items():
+        masks[name] = (flags & flag) != 0
+    masks['uncategorized'] = analyzed & (flags == 0)
+    return masks
+
+
+def build_syllable_coverage(decoded_vocab: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Find which precomposed Hangul syllables a vocabulary covers, in one vectorized pass.
+
+    Masks have HANGUL_SYLLABLE_COUNT entries; entry i stands for chr(HANGUL_SYLLABLE_FIRST + i).
+    'single_token' marks syllables that are a whole token on their own and 'token_prefix' those
+    that start a token (so it includes 'single_token'). Whitespace around tokens is ignored.
+    """
+    single_token = np.zeros(HANGUL_SYLLABLE_COUNT, dtype=bool)
+    token_prefix = np.zeros(HANGUL_SYLLABLE_COUNT, dtype=bool)
+
+    tokens = [token for token in decoded_vocab['token_strings'] if token]
+    if not tokens:
+        return {'single_token': single_token, 'token_prefix': token_prefix}
+
+    lengths = np.fromiter((len(token) for token in tokens), dtype=np.int64, count=len(tokens))
+    ends = np.cumsum(lengths)
+    codepoints = np.frombuffer("".join(tokens).encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+
+    # Positions of non-whitespace characters; each token's first and last one are found by
+    # searching its start and end among them
+    content = np.flatnonzero((build_codepoint_table()[codepoints] & CHAR_SPACE) == 0).astype(np.int32)
+    content = np.append(content, np.int32(len(codepoints)))
+    first = np.searchsorted(content, ends - lengths)
+    last = np.searchsorted(content, ends) - 1
+    has_content = content[first] < ends
+
+    syllables = codepoints[content[first[has_content]]].astype(np.int64) - HANGUL_SYLLABLE_FIRST
+    is_syllable = (syllables >= 0) & (syllables < HANGUL_SYLLABLE_COUNT)
+
+    token_prefix[syllables[is_syllable]] = True
+    single_token[syllables[is_syllable & (first == last)[has_content]]] = True
+    return {'single_token': single_token, 'token_prefix': token_prefix}
+
+
+def is_syllable_covered(coverage_mask: np.ndarray, syllable: str) -> bool:
+    """Check in O(1) whether a precomposed Hangul syllable is set in a syllable coverage mask."""
+    index = ord(syllable) - HANGUL_SYLLABLE_FIRST
+    return 0 <= index < HANGUL_SYLLABLE_COUNT and bool(coverage_mask[index])
+
+
+def encode_token_masks(token_masks: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    Encode boolean masks of equal size for JSON as zlib-compressed, base64 packed bitsets.
+
+    Bit i of a category's bitset (little bit order) is set when token ID i is in the category;
+    syllable coverage masks are encoded the same way, indexed by syllable.
+    """
+    encoded = {'size': len(next(iter(token_masks.values()))), 'bitorder': 'little', 'encoding': 'zlib+base64'}
+    for name, mask in token_masks.items():
+        packed = np.packbits(mask, bitorder='little').tobytes()
+        encoded[name] = base64.b64encode(zlib.compress(packed, 9)).decode('ascii')
+    return encoded
+
+
+def decode_token_masks(encoded: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Decode category masks saved by encode_token_masks back into boolean arrays.
+
+    Masks of different models differ in size; pad the shorter one with np.pad before
+    combining them with NumPy bit operations.
+    """
+    size = encoded['size']
+    masks = {}
+    for name, value in encoded.items():
+        if name in ('size', 'bitorder', 'encoding', 'first_codepoint'):
             continue
+        packed = np.frombuffer(zlib.decompress(base64.b64decode(value)), dtype=np.uint8)
+        masks[name] = np.unpackbits(packed, count=size, bitorder=encoded['bitorder']).astype(bool)
+    return masks
 
-    # Save tokens to JSON files
-    save_token_categories(model_id, pure_english_tokens, english_containing_tokens, 
-                         pure_hangul_tokens, hangul_containing_tokens, special_char_tokens)
 
-    # Get all categorized token IDs
-    pure_english_ids = set(pure_english_tokens.keys())
-    english_containing_ids = set(english_containing_tokens.keys())
-    pure_hangul_ids = set(pure_hangul_tokens.keys())
-    hangul_containing_ids = set(hangul_containing_tokens.keys())
-    special_char_ids = set(special_char_tokens.keys())
+def analyze_token_categories(model_id: str, min_token_id: int = 102,
+                             decoded_vocab: Dict[str, Any] = None, token_id_dir: str = '.') -> Dict[str, Any]:
+    """
+    Analyze tokens in each category for the tokenizer's entire vocabulary.
+
+    The TOKEN_ID_FILES are written to token_id_dir, the working directory by default.
+    """
 
-    # Token IDs in all categories
-    categorized_ids = (pure_english_ids | english_containing_ids |
-                       pure_hangul_ids | hangul_containing_ids |
-                       special_char_ids)
+    if decoded_vocab is None:
+        decoded_vocab = build_decoded_vocabulary(model_id, min_token_id)
+    max_token_id = decoded_vocab['max_token_id']
+    token_ids = decoded_vocab['token_ids']
+    token_strings = decoded_vocab['token_strings']
+
+    # Save tokens to JSON files
+    save_token_categories(model_id, decoded_vocab)
+
+    # Category membership as boolean masks indexed by token ID
+    token_masks = build_category_masks(decoded_vocab)
+    categorized_ids = np.flatnonzero(token_masks['analyzed'] & ~token_masks['uncategorized'])
 
     print(f"categorized_ids {len(categorized_ids)}")
-    token_list = []
-    for token_id in sorted(categorized_ids):
-        token_list.append(str(token_id))
-    print(f"len(token_list) {len(token_list)}")
-    f = open("categorized_token_ids.txt", "wt")
-    ids_string = ",".join(token_list)
+    print(f"len(token_list) {len(categorized_ids)}")
+    f = open(os.path.join(token_id_dir, "categorized_token_ids.txt"), "wt")
+    ids_string = ",".join(map(str, categorized_ids.tolist()))
     f.write(f"token_bias = [{ids_string}]")
     f.close()
 
     # Also save the token strings alongside the IDs
-    f = open("categorized_tokens.json", "wt", encoding="utf-8")
-    categorized_tokens = {}
-    for token_id in sorted(categorized_ids):
-        if token_id in all_tokens:
-            token_string = tokenizer.decode([token_id])
-            categorized_tokens[str(token_id)] = token_string
-    json.dump(categorized_tokens, f, ensure_ascii=False, indent=2)
-    f.close()
-
-    # Token IDs that don't belong to any category
-    uncategorized_ids = all_token_ids - categorized_ids
-    for token_id in uncategorized_ids:
-        if token_id in all_tokens:
-            uncategorized_tokens[token_id] = tokenizer.decode([token_id])
+    positions = np.searchsorted(token_ids, categorized_ids)
+    save_token_json(os.path.join(token_id_dir, "categorized_tokens.json"), token_ids[positions],
+                    [token_strings[p] for p in positions.tolist()])
 
     # Save uncategorized tokens
-    save_uncategorized_tokens(model_id, uncategorized_tokens)
+    save_uncategorized_tokens(model_id, uncategorized_token_strings(decoded_vocab), token_id_dir)
+
+    counts = {name: int(np.count_nonzero(mask)) for name, mask in token_masks.items()}
+
+    # Precomposed Hangul syllables covered as a whole token or as the start of a token
+    syllable_coverage = build_syllable_coverage(decoded_vocab)
 
     return {
         'model_id': model_id,
         'max_token_id': max_token_id,
-        'vocab_size': len(all_token_ids),
+        'vocab_size': counts['analyzed'],
         'statistics': {
-            'total_tokens': len(all_token_ids),
-            'pure_english': len(pure_english_ids),
-            'english_containing': len(english_containing_ids),
-            'pure_hangul': len(pure_hangul_ids),
-            'hangul_containing': len(hangul_containing_ids),
-            'special_char': len(special_char_ids),
-            'uncategorized': len(uncategorized_ids)
+            'total_tokens': counts['analyzed'],
+            'pure_english': counts['pure_english'],
+            'english_containing': counts['english_containing'],
+            'pure_hangul': counts['pure_hangul'],
+            'hangul_containing': counts['hangul_containing'],
+            'special_char': counts['special_char'],
+            'uncategorized': counts['uncategorized'],
+            'single_token_syllables': int(np.count_nonzero(syllable_coverage['single_token'])),
+            'prefix_syllables': int(np.count_nonzero(syllable_coverage['token_prefix']))
         },
-        'token_ids': {
-            'pure_english': sorted(list(pure_english_ids)),
-            'english_containing': sorted(list(english_containing_ids)),
-            'pure_hangul': sorted(list(pure_hangul_ids)),
-            'hangul_containing': sorted(list(hangul_containing_ids)),
-            'special_char': sorted(list(special_char_ids)),
-            'uncategorized': sorted(list(uncategorized_ids))
-        }
+        'token_masks': token_masks,
+        'syllable_coverage': syllable_coverage
     }
 
 
-def save_token_categories(model_id: str, pure_english: Dict[int, str], english_containing: Dict[int, str],
-                         pure_hangul: Dict[int, str], hangul_containing: Dict[int, str], special_char: Dict[int, str]):
+def uncategorized_token_strings(decoded_vocab: Dict[str, Any]) -> Dict[int, str]:
+    """Return the decoded tokens that don't belong to any category, keyed by token ID."""
+    token_ids = decoded_vocab['token_ids']
+    token_strings = decoded_vocab['token_strings']
+    uncategorized_tokens = {}
+    for position in np.flatnonzero(decoded_vocab['token_flags'] == 0).tolist():
+        if token_strings[position] is not None:
+            uncategorized_tokens[int(token_ids[position])] = token_strings[position]
+    return uncategorized_tokens
+
+
+def save_token_json(output_file: str, token_ids, token_strings: List[str]):
+    """
+    Write token IDs and their strings as a JSON object of {token_id: string}.
+
+    The file is written entry by entry in the layout of json.dump(..., ensure_ascii=False, indent=2),
+    so large categories never need an intermediate dictionary.
+    """
+    with open(output_file, 'w', encoding='utf-8') as f:
+        if len(token_ids) == 0:
+            f.write("{}")
+            return
+        separator = "{\n"
+        for token_id, token in zip(token_ids.tolist(), token_strings):
+            f.write(f'{separator}  "{token_id}": {json.dumps(token, ensure_ascii=False)}')
+            separator = ",\n"
+        f.write("\n}")
+
+
+def token_category_file(model_id: str, category_name: str) -> str:
+    """Return the path of the tokens/<model>_<category>.json file of one category."""
+    model_name = model_id.split('/')[-1] if '/' in model_id else model_id
+    return os.path.join("tokens", f"{model_name}_{category_name}.json")
+
+
+def analysis_output_files(model_id: str, token_id_dir: str = '.') -> Dict[str, str]:
+    """
+    List the files an analysis writes besides its result JSON, e.g. to cache them.
+
+    Args:
+        model_id: Model ID of the analysis
+        token_id_dir: Directory the analysis wrote its TOKEN_ID_FILES to
+
+    Returns:
+        Dictionary mapping a model-independent name of each file to its path
+    """
+    output_files = {f"{category_name}.json": token_category_file(model_id, category_name)
+                    for category_name in list(CATEGORY_FLAGS) + ['uncategorized']}
+    output_files.update({filename: os.path.join(token_id_dir, filename) for filename in TOKEN_ID_FILES})
+    return output_files
+
+
+def save_token_categories(model_id: str, decoded_vocab: Dict[str, Any]):
     """Save all token categories to separate JSON files."""
     # Create tokens directory if it doesn't exist
     tokens_dir = "tokens"
     if not os.path.exists(tokens_dir):
         os.makedirs(tokens_dir)
     
-    # Extract model name from model_id for filename
-    model_name = model_id.split('/')[-1] if '/' in model_id else model_id
-    
-    # Save each category
-    categories = {
-        "pure_english": pure_english,
-        "english_containing": english_containing,
-        "pure_hangul": pure_hangul,
-        "hangul_containing": hangul_containing,
-        "special_char": special_char
-    }
-    
-    for category_name, tokens_dict in categories.items():
-        # Convert dictionary keys to strings for JSON serialization
-        tokens_str = {str(k): v for k, v in tokens_dict.items()}
-        
-        # Save to file
-        category_file = os.path.join(tokens_dir, f"{model_name}_{category_name}.json")
-        with open(category_file, 'w', encoding='utf-8') as f:
-            json.dump(tokens_str, f, ensure_ascii=False, indent=2)
+    token_ids = decoded_vocab['token_ids']
+    token_strings = decoded_vocab['token_strings']
+    token_flags = decoded_vocab['token_flags']
+
+    # Save each category, one at a time straight from the token records
+    for category_name, flag in CATEGORY_FLAGS.items():
+        positions = np.flatnonzero(token_flags & flag)
+
+        category_file = token_category_file(model_id, category_name)
+        save_token_json(category_file, token_ids[positions], [token_strings[p] for p in positions.tolist()])
         
-        print(f"Saved {len(tokens_dict)} {category_name} tokens to {category_file}")
+        print(f"Saved {len(positions)} {category_name} tokens to {category_file}")
 
 
-def save_uncategorized_tokens(model_id: str, uncategorized: Dict[int, str]):
-    """Save uncategorized tokens to a JSON file."""
+def save_uncategorized_tokens(model_id: str, uncategorized: Dict[int, str], token_id_dir: str = '.'):
+    """Save uncategorized tokens to a JSON file, and their IDs to uncategorized_token_ids.txt in token_id_dir."""
     tokens_dir = "tokens"
     if not os.path.exists(tokens_dir):
         os.makedirs(tokens_dir)
     
-    # Extract model name
-    model_name = model_id.split('/')[-1] if '/' in model_id else model_id
-    
     # Convert dictionary keys to strings
     tokens_str = {str(k): v for k, v in uncategorized.items()}
     
     # Save to file
-    uncategorized_file = os.path.join(tokens_dir, f"{model_name}_uncategorized.json")
+    uncategorized_file = token_category_file(model_id, 'uncategorized')
     with open(uncategorized_file, 'w', encoding='utf-8') as f:
         json.dump(tokens_str, f, ensure_ascii=False, indent=2)
     
@@ -208,7 +564,7 @@ def save_uncategorized_tokens(model_id: str, uncategorized: Dict[int, str]):
     for token_id in sorted(uncategorized.keys()):
         token_list.append(str(token_id))
     print(f"len(token_list) {len(token_list)}")
-    f = open("uncategorized_token_ids.txt", "wt")
+    f = open(os.path.join(token_id_dir, "uncategorized_token_ids.txt"), "wt")
     ids_string = ",".join(token_list)
     f.write(f"token_bias = [{ids_string}]")
     f.close()
@@ -224,9 +580,51 @@ def print_uncategorized_tokens(model_id: str, token_data: Dict[int, str], max_to
 
 
 def save_analysis_results(analysis_result: Dict[str, Any], output_file: str = 'token_category_analysis.json'):
-    """Save analysis results to a JSON file."""
+    """Save analysis results to a JSON file, with category and syllable coverage masks stored as packed bitsets."""
+    syllable_coverage = encode_token_masks(analysis_result['syllable_coverage'])
+    syllable_coverage['first_codepoint'] = HANGUL_SYLLABLE_FIRST
+    serializable = dict(analysis_result, token_masks=encode_token_masks(analysis_result['token_masks']),
+                        syllable_coverage=syllable_coverage)
     with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(analysis_result, f, ensure_ascii=False, indent=2)
+        json.dump(serializable, f, ensure_ascii=False, indent=2)
+
+
+def save_token_table(decoded_vocab: Dict[str, Any], output_file: str):
+    """
+    Save the decoded vocabulary as a Parquet table with one row per analyzed token ID.
+
+    Columns are model, token_id, token (null if the ID could not be decoded), byte_length
+    (UTF-8) and one boolean column per category, so pandas or duckdb can read only the
+    columns a query needs. Requires pyarrow.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Saving the token table requires pyarrow (pip install pyarrow)") from e
+
+    model_id = decoded_vocab['model_id']
+    model_name = model_id.split('/')[-1] if '/' in model_id else model_id
+    token_ids = decoded_vocab['token_ids']
+    tokens = decoded_vocab['token_strings']
+    flags = decoded_vocab['token_flags']
+
+    byte_lengths = [len(token.encode('utf-8')) if token is not None else None for token in tokens]
+
+    table = pa.table({
+        'model': pa.array([model_name] * len(token_ids)).dictionary_encode(),
+        'token_id': pa.array(token_ids, type=pa.int32()),
+        'token': pa.array(tokens, type=pa.string()),
+        'byte_length': pa.array(byte_lengths, type=pa.int32()),
+        'pure_english': (flags & PURE_ENGLISH) != 0,
+        'english_containing': (flags & ENGLISH_CONTAINING) != 0,
+        'pure_hangul': (flags & PURE_HANGUL) != 0,
+        'hangul_containing': (flags & HANGUL_CONTAINING) != 0,
+        'special_char': (flags & SPECIAL_CHAR) != 0,
+        'uncategorized': flags == 0,
+    })
+    pq.write_table(table, output_file, compression='zstd')
+    print(f"Saved {len(token_ids)} tokens to token table {output_file}")
 
 
 def print_analysis_summary(analysis_result: Dict[str, Any]):
@@ -242,21 +640,44 @@ def print_analysis_summary(analysis_result: Dict[str, Any]):
     print(f"Tokens containing Hangul: {stats['hangul_containing']:,}")
     print(f"Special character tokens: {stats['special_char']:,}")
     print(f"Uncategorized tokens: {stats['uncategorized']:,}")
+    print(f"Hangul syllables as single tokens: {stats['single_token_syllables']:,} of {HANGUL_SYLLABLE_COUNT:,}")
+    print(f"Hangul syllables as token prefixes: {stats['prefix_syllables']:,} of {HANGUL_SYLLABLE_COUNT:,}")
 
 
-def token_analysis(model_id: str, output_file: str = 'token_category_analysis.json'):
+def token_analysis(model_id: str, output_file: str = 'token_category_analysis.json', min_token_id: int = 102,
+                   workers: int = 1, lightweight: bool = False, token_table_file: str = None,
+                   profiler: StageProfiler = None, bundle_dir: str = None, token_id_dir: str = '.'):
+    profiler = profiler or StageProfiler(enabled=False)
+    model_name = model_id.split('/')[-1] if '/' in model_id else model_id
+
+    if bundle_dir:
+        # Open the pre-decoded vocabulary of a tokenizer_bundle.py bundle instead of decoding it
+        from tokenizer_bundle import load_bundle_vocabulary
+        with profiler.stage('load_bundle', model_name):
+            decoded_vocab = load_bundle_vocabulary(bundle_dir, model_id, min_token_id)
+    else:
+        # Load and decode the vocabulary once for the whole pipeline
+        decoded_vocab = build_decoded_vocabulary(model_id, min_token_id, workers, lightweight, profiler)
+    token_count = len(decoded_vocab['token_ids'])
+
+    # Columnar per-token output, if requested
+    if token_table_file:
+        with profiler.stage('token_table', model_name, token_count):
+            save_token_table(decoded_vocab, token_table_file)
+
     # Run complete analysis
-    analysis_result = analyze_token_categories(model_id)
+    with profiler.stage('category_files', model_name, token_count):
+        analysis_result = analyze_token_categories(model_id, decoded_vocab=decoded_vocab, token_id_dir=token_id_dir)
 
     # Save results
-    save_analysis_results(analysis_result, output_file)
+    with profiler.stage('save_results', model_name, token_count):
+        save_analysis_results(analysis_result, output_file)
 
     # Print statistics
     print_analysis_summary(analysis_result)
 
-    # Get tokenizer to decode uncategorized tokens
-    tokenizer = transformers.AutoTokenizer.from_pretrained(model_id)
-    uncategorized_tokens = {tid: tokenizer.decode([tid]) for tid in analysis_result['token_ids']['uncategorized']}
+    # Look up uncategorized token strings in the decoded vocabulary
+    uncategorized_tokens = uncategorized_token_strings(decoded_vocab)
     
     # Print uncategorized tokens
     print_uncategorized_tokens(model_id, uncategorized_tokens)
@@ -273,12 +694,28 @@ def main():
                         help="Minimum token ID to analyze (default: 102)")
     parser.add_argument('--output_file', type=str, default='token_category_analysis.json',
                         help="Path to save the JSON analysis results (default: token_category_analysis.json)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of worker processes that decode and classify vocabulary shards (default: 1)")
+    parser.add_argument('--lightweight_tokenizer', action='store_true',
+                        help="Load the tokenizer straight from its local tokenizer.json or SentencePiece model "
+                             "instead of AutoTokenizer")
+    parser.add_argument('--token_table', type=str, default=None,
+                        help="Also save a Parquet table with one row per token ID (token, byte length, "
+                             "category flags, model); requires pyarrow")
+    parser.add_argument('--bundle', type=str, default=None,
+                        help="Read the decoded vocabulary from a bundle packed with tokenizer_bundle.py "
+                             "instead of loading and decoding the tokenizer")
 
     # Parse arguments
     args = parser.parse_args()
 
+    # Fail before the analysis if the token table can't be written
+    if args.token_table and importlib.util.find_spec('pyarrow') is None:
+        parser.error("--token_table requires pyarrow (pip install pyarrow)")
+
     # Run token analysis
-    token_analysis(args.model_id, args.output_file)
+    token_analysis(args.model_id, args.output_file, args.min_token_id, args.workers, args.lightweight_tokenizer,
+                   args.token_table, bundle_dir=args.bundle)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,245 @@
+import os
+import re
+import json
+import shutil
+import argparse
+from datetime import datetime
+from typing import List, Dict, Any
+
+import numpy as np
+
+from tokenizer_loader import load_lightweight_tokenizer, find_tokenizer_file, SENTENCEPIECE_MODEL_FILE, \
+    CLEAN_UP_BPE_SETTING
+from token_analyzer import load_tokenizer, build_decoded_vocabulary
+
+# Bump when the bundle layout changes so old bundles are rejected instead of misread
+BUNDLE_VERSION = 1
+
+MANIFEST_FILE = 'bundle.json'
+
+# Decoded-vocabulary tables of each model, saved as raw .npy files so they can be memory-mapped
+VOCAB_TABLES = ['token_ids', 'token_flags', 'decoded', 'string_bytes', 'string_offsets']
+
+
+def bundle_directory_name(model_id: str) -> str:
+    """
+    Return the bundle directory name of a model, derived from its full model ID.
+
+    Path separators become '--' (as in the HuggingFace cache), so models with the same name
+    from different organizations or directories get separate directories.
+    """
+    return re.sub(r'[^A-Za-z0-9._-]+', '--', model_id).strip('-.') or 'model'
+
+
+def save_bundle_tokenizer(tokenizer, model_id: str, model_dir: str):
+    """
+    Serialize a loaded tokenizer into a bundle directory in a form load_lightweight_tokenizer reads.
+
+    Fast tokenizers are written as one tokenizer.json (plus the clean-up settings of their config);
+    SentencePiece-only tokenizers keep their tokenizer.model.
+    """
+    backend = getattr(tokenizer, 'backend_tokenizer', None)
+    if backend is not None:
+        backend.save(os.path.join(model_dir, 'tokenizer.json'), pretty=False)
+        # AutoTokenizer and JsonTokenizer name the BPE clean-up override differently
+        clean_up_bpe = getattr(tokenizer, CLEAN_UP_BPE_SETTING, getattr(tokenizer, 'clean_up_bpe', False))
+        config = {'clean_up_tokenization_spaces': bool(getattr(tokenizer, 'clean_up_tokenization_spaces', False)),
+                  CLEAN_UP_BPE_SETTING: bool(clean_up_bpe)}
+        with open(os.path.join(model_dir, 'tokenizer_config.json'), 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2)
+        return
+
+    sentencepiece_model = find_tokenizer_file(model_id, SENTENCEPIECE_MODEL_FILE)
+    if sentencepiece_model is None:
+        raise ValueError(f"Can't serialize the tokenizer of {model_id}: no tokenizer.json backend or "
+                         f"{SENTENCEPIECE_MODEL_FILE}")
+    shutil.copyfile(sentencepiece_model, os.path.join(model_dir, SENTENCEPIECE_MODEL_FILE))
+
+
+def save_vocab_tables(decoded_vocab: Dict[str, Any], model_dir: str):
+    """
+    Save a decoded vocabulary store as .npy tables.
+
+    Token strings are stored as one UTF-8 blob with character offsets, so they are restored by
+    decoding the blob once and slicing it; 'decoded' marks the IDs that could be decoded.
+    """
+    token_strings = decoded_vocab['token_strings']
+    decoded = np.fromiter((token is not None for token in token_strings), dtype=bool, count=len(token_strings))
+    strings = [token if token is not None else '' for token in token_strings]
+
+    tables = {
+        'token_ids': np.asarray(decoded_vocab['token_ids'], dtype=np.int32),
+        'token_flags': np.asarray(decoded_vocab['token_flags'], dtype=np.uint8),
+        'decoded': decoded,
+        'string_bytes': np.frombuffer(''.join(strings).encode('utf-8', 'surrogatepass'), dtype=np.uint8),
+        'string_offsets': np.cumsum([0] + [len(token) for token in strings], dtype=np.int64),
+    }
+    for name in VOCAB_TABLES:
+        np.save(os.path.join(model_dir, f"{name}.npy"), tables[name])
+
+
+def pack_bundle(model_ids: List[str], bundle_dir: str, lightweight: bool = False,
+                workers: int = 1) -> Dict[str, Any]:
+    """
+    Pack tokenizers and their decoded-vocabulary tables into one local bundle.
+
+    Each model gets a directory named after its full model ID (see bundle_directory_name)
+    with its serialized tokenizer and the decoded vocabulary of every token ID (analyses pick
+    their min_token_id when opening the bundle). Models that are already in the bundle are
+    packed again and replaced.
+
+    Args:
+        model_ids: List of model IDs or local tokenizer directories to pack
+        bundle_dir: Bundle directory, created if it doesn't exist
+        lightweight: Load tokenizers with the lightweight loader instead of AutoTokenizer
+        workers: Number of worker processes decoding each vocabulary
+
+    Returns:
+        The bundle manifest
+    """
+    os.makedirs(bundle_dir, exist_ok=True)
+    manifest = load_bundle_manifest(bundle_dir) if os.path.exists(os.path.join(bundle_dir, MANIFEST_FILE)) \
+        else {'version': BUNDLE_VERSION, 'models': []}
+
+    for model_id in model_ids:
+        model_name = model_id.split('/')[-1]
+        directory = bundle_directory_name(model_id)
+        for entry in manifest['models']:
+            if entry['directory'] == directory and entry['model_id'] != model_id:
+                raise ValueError(f"{model_id} and {entry['model_id']} would share bundle directory {directory}")
+
+        print(f"\nPacking {model_id}...")
+        model_dir = os.path.join(bundle_dir, directory)
+        os.makedirs(model_dir, exist_ok=True)
+
+        tokenizer = load_tokenizer(model_id, lightweight)
+        save_bundle_tokenizer(tokenizer, model_id, model_dir)
+
+        # Decode every ID so any min_token_id can be served from the tables
+        decoded_vocab = build_decoded_vocabulary(model_id, -1, workers, lightweight, tokenizer=tokenizer)
+        save_vocab_tables(decoded_vocab, model_dir)
+
+        manifest['models'] = [entry for entry in manifest['models'] if entry['model_id'] != model_id]
+        manifest['models'].append({
+            'model_id': model_id,
+            'name': model_name,
+            'directory': directory,
+            'max_token_id': decoded_vocab['max_token_id'],
+            'loader': 'lightweight' if lightweight else 'auto',
+            'packed': datetime.now().isoformat(timespec='seconds'),
+        })
+
+    with open(os.path.join(bundle_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def load_bundle_manifest(bundle_dir: str) -> Dict[str, Any]:
+    """Load a bundle's manifest, rejecting bundles written in another layout version."""
+    with open(os.path.join(bundle_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != BUNDLE_VERSION:
+        raise ValueError(f"Bundle {bundle_dir} has version {manifest.get('version')}, expected {BUNDLE_VERSION}; "
+                         f"pack it again with tokenizer_bundle.py")
+    return manifest
+
+
+def find_bundle_model(bundle_dir: str, model_id: str) -> Dict[str, Any]:
+    """
+    Find a model's manifest entry by model ID or model name.
+
+    An exact model ID match wins; a model name only matches if one model in the bundle has it.
+
+    Args:
+        bundle_dir: Bundle directory
+        model_id: Model ID as packed, or its last path component
+
+    Returns:
+        The model's manifest entry, with 'path' set to its directory
+    """
+    entries = load_bundle_manifest(bundle_dir)['models']
+    matches = [entry for entry in entries if entry['model_id'] == model_id]
+    if not matches:
+        model_name = model_id.split('/')[-1]
+        matches = [entry for entry in entries if entry['name'] == model_name]
+    if len(matches) > 1:
+        raise KeyError(f"{model_id} matches several models in bundle {bundle_dir} "
+                       f"({', '.join(entry['model_id'] for entry in matches)}); use the full model ID")
+    if not matches:
+        raise KeyError(f"{model_id} is not in bundle {bundle_dir}")
+    return dict(matches[0], path=os.path.join(bundle_dir, matches[0]['directory']))
+
+
+def load_bundle_tokenizer(bundle_dir: str, model_id: str):
+    """Load a model's tokenizer from a bundle with the lightweight loader, without network access."""
+    return load_lightweight_tokenizer(find_bundle_model(bundle_dir, model_id)['path'])
+
+
+def load_bundle_vocabulary(bundle_dir: str, model_id: str, min_token_id: int = 102) -> Dict[str, Any]:
+    """
+    Open a model's decoded vocabulary from a bundle, in the format of build_decoded_vocabulary.
+
+    The ID and flag tables are memory-mapped and sliced to the IDs above min_token_id, so they
+    are read lazily and their pages are shared by every process opening the same bundle.
+    Only the token strings are materialized.
+
+    Args:
+        bundle_dir: Bundle directory
+        model_id: Model ID as packed, or its last path component
+        min_token_id: Token IDs at or below this value are left out, as in build_decoded_vocabulary
+
+    Returns:
+        Decoded vocabulary store
+    """
+    entry = find_bundle_model(bundle_dir, model_id)
+    tables = {name: np.load(os.path.join(entry['path'], f"{name}.npy"), mmap_mode='r') for name in VOCAB_TABLES}
+
+    # IDs are sorted, so the analyzed range is one contiguous slice
+    start = int(np.searchsorted(tables['token_ids'], min_token_id, side='right'))
+    offsets = tables['string_offsets'][start:]
+    text = tables['string_bytes'][:].tobytes().decode('utf-8', 'surrogatepass')
+    decoded = tables['decoded'][start:]
+
+    # Equal strings for different IDs share one object, as in build_decoded_vocabulary
+    interned = {}
+    token_strings = [interned.setdefault(text[begin:end], text[begin:end]) if is_decoded else None
+                     for begin, end, is_decoded in zip(offsets[:-1].tolist(), offsets[1:].tolist(), decoded.tolist())]
+
+    print(f"Loaded {len(token_strings)} decoded tokens for {model_id} from bundle {bundle_dir}")
+    return {
+        'model_id': model_id,
+        'min_token_id': min_token_id,
+        'max_token_id': entry['max_token_id'],
+        'token_ids': tables['token_ids'][start:],
+        'token_strings': token_strings,
+        'token_flags': tables['token_flags'][start:],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tokenizer Bundle Packer - pack tokenizers and decoded vocabularies for offline cold starts")
+
+    parser.add_argument('--models', type=str,
+                        default='meta-llama/Llama-4-Maverick-17B-128E meta-llama/Llama-4-Scout-17B-16E'
+                        ' deepseek-ai/DeepSeek-V3-0324 Qwen/QwQ-32B mistralai/Mistral-Small-3.1-24B-Base-2503 google/gemma-3-27b-it',
+                        help="List of model IDs to pack")
+    parser.add_argument('--bundle_dir', type=str, default="results/tokenizer_bundle",
+                        help="Bundle directory to create or update (default: results/tokenizer_bundle)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of worker processes that decode each vocabulary (default: 1)")
+    parser.add_argument('--lightweight_tokenizer', action='store_true',
+                        help="Load tokenizers straight from their local tokenizer.json or SentencePiece model "
+                             "instead of AutoTokenizer")
+
+    args = parser.parse_args()
+
+    manifest = pack_bundle(args.models.split(), args.bundle_dir, args.lightweight_tokenizer, args.workers)
+
+    print(f"\nBundle {os.path.abspath(args.bundle_dir)} holds {len(manifest['models'])} models:")
+    for entry in manifest['models']:
+        print(f"- {entry['model_id']} (max token ID {entry['max_token_id']}, {entry['loader']} loader)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import os
+import json
+from typing import List, Dict, Any, Union
+
+# Files the lightweight loader can build a tokenizer from, in order of preference
+TOKENIZER_JSON_FILE = 'tokenizer.json'
+SENTENCEPIECE_MODEL_FILE = 'tokenizer.model'
+TOKENIZER_CONFIG_FILE = 'tokenizer_config.json'
+
+# tokenizer_config.json setting that makes transformers clean up BPE output as well
+CLEAN_UP_BPE_SETTING = 'clean_up_tokenization_spaces_for_bpe_even_though_it_will_corrupt_output'
+
+
+def find_tokenizer_file(model_id: str, filename: str) -> str:
+    """
+    Find a tokenizer file locally without touching the network.
+
+    Args:
+        model_id: Local tokenizer directory or HuggingFace model ID
+        filename: Name of the file inside the model repository
+
+    Returns:
+        Path to the file, or None if it is not available locally
+    """
+    if os.path.isdir(model_id):
+        path = os.path.join(model_id, filename)
+        return path if os.path.isfile(path) else None
+
+    from huggingface_hub import try_to_load_from_cache
+
+    path = try_to_load_from_cache(model_id, filename)
+    if isinstance(path, str) and os.path.isfile(path):
+        return path
+    return None
+
+
+def clean_up_tokenization(text: str) -> str:
+    """Remove spaces before punctuation and contractions, like transformers' clean_up_tokenization."""
+    return (text.replace(" .", ".").replace(" ?", "?").replace(" !", "!").replace(" ,", ",")
+            .replace(" ' ", "'").replace(" n't", "n't").replace(" 'm", "'m").replace(" 's", "'s")
+            .replace(" 've", "'ve").replace(" 're", "'re"))
+
+
+class EncodingResult(dict):
+    """Encoding outputs keyed like transformers' BatchEncoding, keeping the backend encodings too."""
+
+    def __init__(self, data: Dict[str, Any], encodings: List[Any] = None):
+        super().__init__(data)
+        self.encodings = encodings
+
+
+class JsonTokenizer:
+    """
+    Minimal tokenizer backed directly by a tokenizers.Tokenizer loaded from tokenizer.json.
+
+    Exposes only the encode/decode/vocab surface used by the analyzers, with the same
+    method names as a transformers fast tokenizer. Like transformers, decoding skips the
+    clean_up_tokenization_spaces step for BPE models unless clean_up_bpe is set, since it
+    removes real spaces before punctuation from BPE output.
+    """
+
+    is_fast = True
+
+    def __init__(self, backend, clean_up_tokenization_spaces: bool = False, clean_up_bpe: bool = False):
+        self._tokenizer = backend
+        self.clean_up_tokenization_spaces = clean_up_tokenization_spaces
+        self.clean_up_bpe = clean_up_bpe
+
+    @property
+    def backend_tokenizer(self):
+        return self._tokenizer
+
+    def __len__(self) -> int:
+        return self._tokenizer.get_vocab_size(with_added_tokens=True)
+
+    def get_vocab(self) -> Dict[str, int]:
+        return self._tokenizer.get_vocab(with_added_tokens=True)
+
+    def _applies_clean_up(self, clean_up_tokenization_spaces: bool = None) -> bool:
+        if clean_up_tokenization_spaces is None:
+            clean_up_tokenization_spaces = self.clean_up_tokenization_spaces
+        if not clean_up_tokenization_spaces:
+            return False
+        return type(self._tokenizer.model).__name__ != 'BPE' or self.clean_up_bpe
+
+    def decode(self, token_ids: List[int], skip_special_tokens: bool = False,
+               clean_up_tokenization_spaces: bool = None) -> str:
+        text = self._tokenizer.decode(token_ids, skip_special_tokens=skip_special_tokens)
+        return clean_up_tokenization(text) if self._applies_clean_up(clean_up_tokenization_spaces) else text
+
+    def batch_decode(self, sequences: List[List[int]], skip_special_tokens: bool = False,
+                     clean_up_tokenization_spaces: bool = None) -> List[str]:
+        texts = self._tokenizer.decode_batch(sequences, skip_special_tokens=skip_special_tokens)
+        if self._applies_clean_up(clean_up_tokenization_spaces):
+            return [clean_up_tokenization(text) for text in texts]
+        return texts
+
+    def __call__(self, text: Union[str, List[str]], return_offsets_mapping: bool = False,
+                 add_special_tokens: bool = True) -> Dict[str, Any]:
+        if isinstance(text, str):
+            encoding = self._tokenizer.encode(text, add_special_tokens=add_special_tokens)
+            result = {"input_ids": encoding.ids}
+            if return_offsets_mapping:
+                result["offset_mapping"] = encoding.offsets
+            return EncodingResult(result, [encoding])
+
+        encodings = self._tokenizer.encode_batch(text, add_special_tokens=add_special_tokens)
+        result = {"input_ids": [encoding.ids for encoding in encodings]}
+        if return_offsets_mapping:
+            result["offset_mapping"] = [encoding.offsets for encoding in encodings]
+        return EncodingResult(result, encodings)
+
+    def convert_ids_to_tokens(self, token_ids: List[int]) -> List[str]:
+        return [self._tokenizer.id_to_token(token_id) for token_id in token_ids]
+
+    def convert_tokens_to_string(self, tokens: List[str]) -> str:
+        decoder = self._tokenizer.decoder
+        return decoder.decode(tokens) if decoder is not None else " ".join(tokens)
+
+
+class SentencePieceTokenizer:
+    """
+    Minimal tokenizer backed by a SentencePiece model, for repositories without tokenizer.json.
+
+    Decoding follows SentencePiece's own rules, so single-piece strings can differ slightly
+    from a converted transformers tokenizer (e.g. the leading space of a word piece), and
+    encodings carry no offset mapping.
+    """
+
+    is_fast = False
+
+    def __init__(self, processor):
+        self._processor = processor
+
+    def __len__(self) -> int:
+        return self._processor.get_piece_size()
+
+    def get_vocab(self) -> Dict[str, int]:
+        return {self._processor.id_to_piece(token_id): token_id for token_id in range(len(self))}
+
+    def decode(self, token_ids: List[int], skip_special_tokens: bool = False,
+               clean_up_tokenization_spaces: bool = None) -> str:
+        return self._processor.decode(list(token_ids))
+
+    def batch_decode(self, sequences: List[List[int]], skip_special_tokens: bool = False,
+                     clean_up_tokenization_spaces: bool = None) -> List[str]:
+        return self._processor.decode([list(sequence) for sequence in sequences])
+
+    def __call__(self, text: Union[str, List[str]], return_offsets_mapping: bool = False,
+                 add_special_tokens: bool = True) -> Dict[str, Any]:
+        # No offset_mapping: SentencePiece only reports offsets through its optional protobuf
+        # output, and callers already fall back to convert_tokens_to_string without it
+        token_ids = self._processor.encode(text, add_bos=add_special_tokens)
+        return {"input_ids": token_ids}
+
+    def convert_ids_to_tokens(self, token_ids: List[int]) -> List[str]:
+        return [self._processor.id_to_piece(token_id) for token_id in token_ids]
+
+    def convert_tokens_to_string(self, tokens: List[str]) -> str:
+        return self._processor.decode_pieces(list(tokens))
+
+
+def load_lightweight_tokenizer(model_id: str):
+    """
+    Load a tokenizer without going through transformers.AutoTokenizer.
+
+    Builds a tokenizers.Tokenizer straight from a local tokenizer.json when the model has one,
+    and otherwise falls back to the SentencePiece model (tokenizer.model). Files must already
+    be available locally, either in a directory or in the HuggingFace cache.
+
+    Args:
+        model_id: Local tokenizer directory or HuggingFace model ID
+
+    Returns:
+        JsonTokenizer or SentencePieceTokenizer
+    """
+    tokenizer_json = find_tokenizer_file(model_id, TOKENIZER_JSON_FILE)
+    if tokenizer_json is not None:
+        from tokenizers import Tokenizer
+
+        config = {}
+        config_file = find_tokenizer_file(model_id, TOKENIZER_CONFIG_FILE)
+        if config_file is not None:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+
+        return JsonTokenizer(Tokenizer.from_file(tokenizer_json),
+                             bool(config.get('clean_up_tokenization_spaces', False)),
+                             bool(config.get(CLEAN_UP_BPE_SETTING, False)))
+
+    sentencepiece_model = find_tokenizer_file(model_id, SENTENCEPIECE_MODEL_FILE)
+    if sentencepiece_model is not None:
+        import sentencepiece
+
+        return SentencePieceTokenizer(sentencepiece.SentencePieceProcessor(model_file=sentencepiece_model))
+
+    raise FileNotFoundError(f"No local {TOKENIZER_JSON_FILE} or {SENTENCEPIECE_MODEL_FILE} found for {model_id}")
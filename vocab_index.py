@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+import os
+import argparse
+import json
+import hashlib
+import shutil
+from typing import List, Dict, Any, TYPE_CHECKING
+
+import numpy as np
+
+from token_analyzer import build_decoded_vocabulary, CATEGORY_FLAGS, HANGUL_CONTAINING
+from tokenizer_bundle import bundle_directory_name
+
+# pandas is slow to import, so it is imported by the function that uses it
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Bump when the artifact layout changes
+VOCAB_INDEX_VERSION = 1
+
+# Membership of every indexed token is one bit per model in a uint64
+MAX_INDEXED_MODELS = 64
+
+INDEX_MANIFEST_FILE = 'models.json'
+INDEX_TABLE_FILE = 'index.npz'
+
+# Token sets compared in the intersection matrices: every token, then each category
+INDEX_CATEGORIES = {'all': None, **CATEGORY_FLAGS}
+
+
+def hash_tokens(token_strings: List[str]) -> np.ndarray:
+    """Hash decoded token strings to stable 64-bit integers (BLAKE2b of the UTF-8 bytes)."""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(token.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'little')
+         for token in token_strings),
+        dtype=np.uint64, count=len(token_strings))
+
+
+def build_vocab_artifact(decoded_vocab: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Build a model's index artifact from its decoded vocabulary store.
+
+    Token IDs that decode to the same string count once. The artifact holds the sorted unique
+    token hashes, their category flags, and the strings in the same order as UTF-8 bytes plus
+    offsets, so shared tokens can be listed without the tokenizer.
+    """
+    token_strings = decoded_vocab['token_strings']
+    token_flags = decoded_vocab['token_flags']
+
+    unique_strings = {}
+    for token, flags in zip(token_strings, token_flags.tolist()):
+        if token is not None:
+            unique_strings.setdefault(token, flags)
+
+    strings = list(unique_strings)
+    hashes = hash_tokens(strings)
+    order = np.argsort(hashes, kind='stable')
+    strings = [strings[i] for i in order]
+    encoded = [token.encode('utf-8', 'surrogatepass') for token in strings]
+
+    return {
+        'hashes': hashes[order],
+        'flags': np.fromiter(unique_strings.values(), dtype=np.uint8, count=len(strings))[order],
+        'string_bytes': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+        'string_offsets': np.cumsum([0] + [len(token) for token in encoded], dtype=np.int64),
+    }
+
+
+def artifact_strings(artifact: Dict[str, np.ndarray], positions: np.ndarray) -> List[str]:
+    """Return the token strings at the given positions of a model artifact."""
+    data = artifact['string_bytes'].tobytes()
+    offsets = artifact['string_offsets']
+    return [data[offsets[i]:offsets[i + 1]].decode('utf-8', 'surrogatepass') for i in positions]
+
+
+def empty_index() -> Dict[str, Any]:
+    """Return an index with no models."""
+    index = {
+        'models': [],
+        'hashes': np.empty(0, dtype=np.uint64),
+        'masks': np.empty(0, dtype=np.uint64),
+        'flags': np.empty(0, dtype=np.uint8),
+    }
+    for category in INDEX_CATEGORIES:
+        index[f'intersection_{category}'] = np.zeros((0, 0), dtype=np.int64)
+    return index
+
+
+def load_index(index_dir: str) -> Dict[str, Any]:
+    """Load the index table and manifest from index_dir, or return an empty index."""
+    manifest_path = os.path.join(index_dir, INDEX_MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return empty_index()
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != VOCAB_INDEX_VERSION:
+        raise ValueError(f"{index_dir} holds a version {manifest.get('version')} index, "
+                         f"expected version {VOCAB_INDEX_VERSION}")
+
+    with np.load(os.path.join(index_dir, INDEX_TABLE_FILE)) as table:
+        index = {name: table[name] for name in table.files}
+    index['models'] = manifest['models']
+    return index
+
+
+def save_index(index: Dict[str, Any], index_dir: str):
+    """Save the index table and manifest to index_dir."""
+    os.makedirs(index_dir, exist_ok=True)
+    np.savez_compressed(os.path.join(index_dir, INDEX_TABLE_FILE),
+                        **{name: value for name, value in index.items() if name != 'models'})
+    with open(os.path.join(index_dir, INDEX_MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'version': VOCAB_INDEX_VERSION, 'models': index['models']}, f, ensure_ascii=False, indent=2)
+
+
+def artifact_file_name(model_id: str) -> str:
+    """Return the artifact file name of a model, derived from its full model ID."""
+    return f"{bundle_directory_name(model_id)}.npz"
+
+
+def check_artifact_file(index: Dict[str, Any], model_id: str):
+    """Raise if another indexed model already uses the artifact file model_id would be saved to."""
+    file_name = artifact_file_name(model_id)
+    for entry in index['models']:
+        if entry['file'] == file_name and entry['model_id'] != model_id:
+            raise ValueError(f"{model_id} and {entry['model_id']} would share artifact file {file_name}")
+
+
+def check_min_token_id(index: Dict[str, Any], min_token_id: int, model_id: str):
+    """Raise if model_id was decoded from a different minimum token ID than the models already indexed."""
+    if index['models'] and index['models'][0]['min_token_id'] != min_token_id:
+        raise ValueError(f"{model_id} uses min_token_id {min_token_id}, but the index was built with "
+                         f"min_token_id {index['models'][0]['min_token_id']}; overlaps would not be comparable")
+
+
+def find_index_model(index: Dict[str, Any], model_id: str) -> int:
+    """
+    Find a model's position in the index by model ID or model name.
+
+    An exact model ID match wins; a model name only matches if one indexed model has it.
+    """
+    positions = [i for i, entry in enumerate(index['models']) if entry['model_id'] == model_id]
+    if not positions:
+        model_name = model_id.split('/')[-1]
+        positions = [i for i, entry in enumerate(index['models']) if entry['model'] == model_name]
+    if len(positions) > 1:
+        raise KeyError(f"{model_id} matches several indexed models "
+                       f"({', '.join(index['models'][i]['model_id'] for i in positions)}); use the full model ID")
+    if not positions:
+        raise KeyError(f"{model_id} is not in the vocabulary index")
+    return positions[0]
+
+
+def load_vocab_artifact(index_dir: str, model_entry: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Load one model's artifact listed in the index manifest."""
+    with np.load(os.path.join(index_dir, model_entry['file'])) as artifact:
+        return {name: artifact[name] for name in artifact.files}
+
+
+def add_to_index(index: Dict[str, Any], model_entry: Dict[str, Any], artifact: Dict[str, np.ndarray]):
+    """
+    Add one model to the index in place.
+
+    The model's sorted hashes are looked up in the index table with one searchsorted, which
+    gives its intersection with every indexed model at once; the new matrix row and column
+    are filled from that, and existing entries are left as they are. The table then gains the
+    model's membership bit and any tokens no indexed model had.
+    """
+    check_min_token_id(index, model_entry['min_token_id'], model_entry['model_id'])
+    num_models = len(index['models'])
+    if num_models >= MAX_INDEXED_MODELS:
+        raise ValueError(f"The vocabulary index holds at most {MAX_INDEXED_MODELS} models")
+
+    hashes = artifact['hashes']
+    flags = artifact['flags']
+    positions = np.searchsorted(index['hashes'], hashes)
+    found = positions < len(index['hashes'])
+    found[found] = index['hashes'][positions[found]] == hashes[found]
+
+    # Membership bits of the indexed models for each of the new model's tokens that they share
+    shared_bits = (index['masks'][positions[found], None] >> np.arange(num_models, dtype=np.uint64)) & np.uint64(1)
+    shared_flags = flags[found]
+
+    for category, flag in INDEX_CATEGORIES.items():
+        in_category = np.ones(len(shared_flags), dtype=bool) if flag is None else (shared_flags & flag) != 0
+        row = shared_bits[in_category].sum(axis=0, dtype=np.int64)
+        size = len(flags) if flag is None else int(np.count_nonzero(flags & flag))
+
+        matrix = np.zeros((num_models + 1, num_models + 1), dtype=np.int64)
+        matrix[:num_models, :num_models] = index[f'intersection_{category}']
+        matrix[num_models, :num_models] = row
+        matrix[:num_models, num_models] = row
+        matrix[num_models, num_models] = size
+        index[f'intersection_{category}'] = matrix
+
+    model_bit = np.uint64(1) << np.uint64(num_models)
+    index['masks'][positions[found]] |= model_bit
+
+    # Insert the new tokens; positions are against the old table, so the result stays sorted
+    new_positions = positions[~found]
+    index['hashes'] = np.insert(index['hashes'], new_positions, hashes[~found])
+    index['masks'] = np.insert(index['masks'], new_positions, np.full(len(new_positions), model_bit, dtype=np.uint64))
+    index['flags'] = np.insert(index['flags'], new_positions, flags[~found])
+    index['models'].append(model_entry)
+
+
+def index_model(index: Dict[str, Any], index_dir: str, model_id: str, min_token_id: int = 102,
+                workers: int = 1, lightweight: bool = False):
+    """Decode one tokenizer's vocabulary, save its artifact to index_dir and add it to the index."""
+    check_artifact_file(index, model_id)
+    check_min_token_id(index, min_token_id, model_id)
+    model_name = model_id.split('/')[-1]
+    decoded_vocab = build_decoded_vocabulary(model_id, min_token_id, workers, lightweight)
+    artifact = build_vocab_artifact(decoded_vocab)
+
+    model_entry = {
+        'model': model_name,
+        'model_id': model_id,
+        'min_token_id': min_token_id,
+        'tokens': len(artifact['hashes']),
+        'file': artifact_file_name(model_id),
+    }
+    np.savez_compressed(os.path.join(index_dir, model_entry['file']), **artifact)
+    add_to_index(index, model_entry, artifact)
+
+
+def merge_index(index: Dict[str, Any], index_dir: str, other_dir: str) -> List[str]:
+    """
+    Merge the models of another index directory into this one, reusing their saved artifacts.
+
+    Models are matched by full model ID; artifacts are copied under this index's file names.
+    Nothing is merged if the other index was built with a different minimum token ID.
+
+    Returns:
+        IDs of the models that were added
+    """
+    other_models = load_index(other_dir)['models']
+    for model_entry in other_models:
+        check_min_token_id(index, model_entry['min_token_id'], model_entry['model_id'])
+
+    indexed = {entry['model_id'] for entry in index['models']}
+    added = []
+    for model_entry in other_models:
+        if model_entry['model_id'] in indexed:
+            continue
+        check_artifact_file(index, model_entry['model_id'])
+        artifact = load_vocab_artifact(other_dir, model_entry)
+        merged_entry = dict(model_entry, file=artifact_file_name(model_entry['model_id']))
+        shutil.copyfile(os.path.join(other_dir, model_entry['file']), os.path.join(index_dir, merged_entry['file']))
+        add_to_index(index, merged_entry, artifact)
+        added.append(model_entry['model_id'])
+    return added
+
+
+def create_overlap_table(index: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Turn the intersection matrices into one table with a row per category and model pair.
+
+    'Only in Model 1' is the difference matrix entry (tokens of Model 1 missing from Model 2).
+    """
+    import pandas as pd
+    
+    # Short names are only for display; fall back to the model ID when two models share a name
+    short_names = [entry['model'] for entry in index['models']]
+    model_names = [entry['model'] if short_names.count(entry['model']) == 1 else entry['model_id']
+                   for entry in index['models']]
+    rows = []
+    for category in INDEX_CATEGORIES:
+        matrix = index[f'intersection_{category}']
+        sizes = np.diag(matrix)
+        for i in range(len(model_names)):
+            for j in range(i + 1, len(model_names)):
+                shared = int(matrix[i, j])
+                union = int(sizes[i] + sizes[j]) - shared
+                rows.append({
+                    'Category': category,
+                    'Model 1': model_names[i],
+                    'Model 2': model_names[j],
+                    'Shared Tokens': shared,
+                    'Only in Model 1': int(sizes[i]) - shared,
+                    'Only in Model 2': int(sizes[j]) - shared,
+                    'Jaccard Similarity': shared / union if union else 0,
+                })
+    return pd.DataFrame(rows)
+
+
+def shared_tokens(index: Dict[str, Any], index_dir: str, model_1: str, model_2: str,
+                  flag: int = HANGUL_CONTAINING) -> List[str]:
+    """
+    List the decoded tokens two indexed models share, optionally limited to one category.
+
+    Args:
+        index: Loaded index
+        index_dir: Directory holding the model artifacts
+        model_1: Model ID of the first model, or its name if no other indexed model has it
+        model_2: Model ID of the second model, or its name if no other indexed model has it
+        flag: Category flag the tokens must have, or None for every shared token
+
+    Returns:
+        Sorted list of shared token strings
+    """
+    position_1 = find_index_model(index, model_1)
+    position_2 = find_index_model(index, model_2)
+    both = (np.uint64(1) << np.uint64(position_1)) | (np.uint64(1) << np.uint64(position_2))
+    selected = (index['masks'] & both) == both
+    if flag is not None:
+        selected &= (index['flags'] & flag) != 0
+
+    artifact = load_vocab_artifact(index_dir, index['models'][position_1])
+    positions = np.searchsorted(artifact['hashes'], index['hashes'][selected])
+    return sorted(artifact_strings(artifact, positions))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cross-Tokenizer Vocabulary Index - shared and distinct decoded tokens between models")
+
+    parser.add_argument('--models', type=str, default='',
+                        help="List of model IDs to add to the index; model IDs already indexed are skipped")
+    parser.add_argument('--index_dir', type=str, default="results/vocab_index",
+                        help="Directory holding the index and per-model artifacts (default: results/vocab_index)")
+    parser.add_argument('--merge', type=str, nargs='*', default=[],
+                        help="Other index directories whose models are merged into this index")
+    parser.add_argument('--min_token_id', type=int, default=102,
+                        help="Minimum token ID to index; must match the models already in the index (default: 102)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of worker processes that decode vocabulary shards (default: 1)")
+    parser.add_argument('--shared', type=str, nargs=2, metavar=('MODEL_1', 'MODEL_2'), default=None,
+                        help="Save the Hangul-containing tokens two indexed models share, given by model ID "
+                             "(or by name when it is unique in the index)")
+    parser.add_argument('--lightweight_tokenizer', action='store_true',
+                        help="Load tokenizers straight from their local tokenizer.json or SentencePiece model "
+                             "instead of AutoTokenizer")
+
+    args = parser.parse_args()
+
+    os.makedirs(args.index_dir, exist_ok=True)
+    index = load_index(args.index_dir)
+
+    for other_dir in args.merge:
+        added = merge_index(index, args.index_dir, other_dir)
+        print(f"Merged {len(added)} models from {other_dir}: {', '.join(added) or 'none'}")
+
+    indexed = {entry['model_id'] for entry in index['models']}
+    for model_id in args.models.split():
+        if model_id in indexed:
+            print(f"Already indexed: {model_id}")
+            continue
+        index_model(index, args.index_dir, model_id, args.min_token_id, args.workers, args.lightweight_tokenizer)
+        indexed.add(model_id)
+
+    save_index(index, args.index_dir)
+
+    overlap_df = create_overlap_table(index)
+    overlap_path = os.path.join(args.index_dir, 'vocab_overlap.csv')
+    overlap_df.to_csv(overlap_path, index=False)
+
+    print(f"\n=== Vocabulary Overlap ({len(index['models'])} models, {len(index['hashes']):,} distinct tokens) ===")
+    if len(overlap_df):
+        print(overlap_df[overlap_df['Category'].isin(['all', 'hangul_containing'])].to_string(index=False))
+    print(f"\nOverlap table saved to: {overlap_path}")
+
+    if args.shared:
+        tokens = shared_tokens(index, args.index_dir, *args.shared)
+        shared_path = os.path.join(args.index_dir, f"shared_{bundle_directory_name(args.shared[0])}_"
+                                                   f"{bundle_directory_name(args.shared[1])}.json")
+        with open(shared_path, 'w', encoding='utf-8') as f:
+            json.dump(tokens, f, ensure_ascii=False, indent=2)
+        print(f"{len(tokens)} shared Hangul-containing tokens saved to: {shared_path}")
+
+
+if __name__ == "__main__":
+    main()